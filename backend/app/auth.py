@@ -1,13 +1,17 @@
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
+from app.database import get_async_db
 from app.models.user import User
+from app.passwords import password_hasher
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,15 +19,29 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Changes made through another worker reach this one within the TTL; 0 disables
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/users/login")
 
+# Verified principals by token digest, so repeat requests skip the JWT and the users query
+principal_cache: TTLCache[User] = TTLCache(ttl=AUTH_CACHE_TTL_SECONDS, max_entries=AUTH_CACHE_MAX_ENTRIES)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return password_hasher.verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.verify_and_update_async(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash_async(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -35,29 +53,61 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str, credentials_exception):
+def decode_token(token: str, credentials_exception) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        return username
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+def verify_token(token: str, credentials_exception):
+    return decode_token(token, credentials_exception)["sub"]
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _detached_user(user: User) -> User:
+    """A session-free copy of ``user`` that is safe to share between requests."""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+
+def invalidate_user_principals(user_id: int) -> None:
+    """Forget cached principals of ``user_id`` after the user changes."""
+    principal_cache.invalidate_where(lambda user: user.id == user_id)
+
+async def _find_user(db: AsyncSession, username: str) -> Optional[User]:
+    return (await db.execute(select(User).where(User.username == username))).scalars().first()
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """Resolve the bearer token's user, from ``principal_cache`` when possible.
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    Cached users are detached, read-only copies kept for at most
+    ``AUTH_CACHE_TTL_SECONDS`` and never past the token's expiry. Misses
+    read the primary: a lagging replica could re-cache a user just
+    invalidated by a write, which the cache generation cannot detect.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    username = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.username == username).first()
+    digest = _token_digest(token)
+    user = principal_cache.get(digest)
+    if user is not None:
+        return user
+    generation = principal_cache.generation
+    payload = decode_token(token, credentials_exception)
+    user = await _find_user(db, payload["sub"])
     if user is None:
         raise credentials_exception
+    user = _detached_user(user)
+    expires_at = payload.get("exp")
+    ttl = None if expires_at is None else expires_at - time.time()
+    principal_cache.set(digest, user, ttl=ttl, generation=generation)
     return user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
+async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
@@ -0,0 +1,283 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, Iterator, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@dataclass
+class _Entry(Generic[T]):
+    value: T
+    expires_at: float
+
+class AsyncTTLCache(Generic[T]):
+    """Stale-while-revalidate TTL cache with request coalescing.
+
+    * Concurrent misses for the same key share one in-flight load.
+    * Once an entry expires it is still served while a single background
+      refresh runs; only entries older than ``ttl + max_stale`` block.
+    * At most ``max_entries`` keys are kept, evicting the least recently used.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 128, max_stale: Optional[float] = None):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.max_stale = max_stale
+        self._entries: "OrderedDict[Hashable, _Entry[T]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Task[T]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = time.monotonic() - entry.expires_at
+            if age < 0:
+                return entry.value
+            if self.max_stale is None or age < self.max_stale:
+                self._refresh(key, loader)
+                return entry.value
+        # A cancelled caller must not cancel the load other callers wait on
+        return await asyncio.shield(self._refresh(key, loader))
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            task.add_done_callback(self._log_failure)
+            self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        try:
+            value = await loader()
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    @staticmethod
+    def _log_failure(task: "asyncio.Task[Any]") -> None:
+        # Retrieving the exception stops asyncio warning about background
+        # refreshes nobody awaited; foreground callers still see it raised.
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Cache load failed", exc_info=task.exception())
+
+class TTLCache(Generic[T]):
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    ``generation`` moves on with every invalidation; passing the value read
+    before a load to ``set`` drops results that an invalidation raced past.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, _Entry[T]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(self, key: Hashable, value: T, ttl: Optional[float] = None, generation: Optional[int] = None) -> None:
+        """Store ``value`` for ``ttl`` (at most the cache's), unless invalidated since ``generation``."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = _Entry(value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            self.generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[T], bool]) -> int:
+        """Drop every entry whose value matches ``predicate``; returns how many."""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key, entry in self._entries.items() if predicate(entry.value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """Whether an ``If-None-Match`` header names any of ``etags`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") in etags for tag in if_none_match.split(","))
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A response body serialised once, with a strong ETag over its bytes.
+
+    ``variants`` memoises the body compressed per content coding, filled
+    in as clients ask for each one; each variant is a distinct
+    representation with its own ETag.
+    """
+
+    content: bytes
+    etag: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def from_content(cls, content: bytes, variants: Optional[Dict[str, bytes]] = None) -> "EncodedBody":
+        return cls(content, '"' + hashlib.sha256(content).hexdigest()[:32] + '"', variants or {})
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match: Optional[str], encodings: Optional[Iterable[str]] = None) -> bool:
+        """Whether an ``If-None-Match`` header names this body or one of its variants.
+
+        ``encodings`` lists the codings whose variants count, including ones
+        not compressed yet; it defaults to those in ``variants``. Uses weak
+        comparison, as RFC 9110 prescribes for ``If-None-Match``.
+        """
+        encodings = self.variants if encodings is None else encodings
+        return etag_matches(if_none_match, self.etag, *(self.variant_etag(encoding) for encoding in encodings))
+
+@dataclass
+class Validators:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def request_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class DiskResponseCache:
+    """Gzip-compressed HTTP response bodies plus their ETag/Last-Modified validators.
+
+    Entries survive restarts, so a fresh process can still revalidate with a
+    conditional request instead of downloading the full body again.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def key(url: str, params: Mapping[str, Any]) -> str:
+        canonical = url + "?" + "&".join(f"{name}={params[name]}" for name in sorted(params))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def load_validators(self, key: str) -> Optional[Validators]:
+        try:
+            with open(self._path(key, ".meta.json"), "r", encoding="utf-8") as meta:
+                return Validators(**json.load(meta))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def replay(self, key: str, feed: Callable[[bytes], None], chunk_size: int = 64 * 1024) -> bool:
+        """Stream the stored body into ``feed`` chunk by chunk.
+
+        Returns ``False`` if there is no readable body for ``key``.
+        """
+        try:
+            with gzip.open(self._path(key, ".body.gz"), "rb") as body:
+                while chunk := body.read(chunk_size):
+                    feed(chunk)
+        except (OSError, EOFError):
+            return False
+        return True
+
+    @contextmanager
+    def writer(self, key: str, validators: Validators) -> Iterator["_BodyWriter"]:
+        """Compress a body to disk as it is written; publish it on clean exit.
+
+        If the block raises, the partial body is discarded and the previous
+        entry is left untouched.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as body:
+                yield _BodyWriter(body)
+            # Body first: a reader that sees the new validators must find the new body
+            os.replace(tmp_path, self._path(key, ".body.gz"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._write_atomic(
+            self._path(key, ".meta.json"),
+            json.dumps({"etag": validators.etag, "last_modified": validators.last_modified}).encode("utf-8"),
+        )
+
+    def store(self, key: str, validators: Validators, chunks: Iterable[bytes]) -> None:
+        """Compress and publish a body that was received in ``chunks``."""
+        with self.writer(key, validators) as body:
+            for chunk in chunks:
+                body.write(chunk)
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+class _BodyWriter:
+    __slots__ = ("_body",)
+
+    def __init__(self, body: gzip.GzipFile):
+        self._body = body
+
+    def write(self, chunk: bytes) -> None:
+        self._body.write(chunk)
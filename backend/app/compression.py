@@ -0,0 +1,178 @@
+import os
+import zlib
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without the compression extra
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without the compression extra
+    zstandard = None
+
+load_dotenv()
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Levels for every response, cached bodies included: most cache keys are
+# one-off pages, and the top brotli/zstd levels cost ~50x more CPU for a few percent.
+_DYNAMIC_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript")
+
+def available_encodings() -> List[str]:
+    """Supported content codings, most preferred first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best available coding for an ``Accept-Encoding`` header, if any."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for coding in available_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body with ``encoding``."""
+    level = _DYNAMIC_LEVELS[encoding]
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return _GzipStream(level).finish(data)
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def write(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def write(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        return self._compressor.process(chunk) + self._compressor.finish()
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def write(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+_STREAMS = {"gzip": _GzipStream, "br": _BrotliStream, "zstd": _ZstdStream}
+
+class CompressionMiddleware:
+    """Negotiated zstd/brotli/gzip compression for dynamic responses.
+
+    Responses that already carry a ``Content-Encoding`` (such as cached
+    bodies with memoised compressed variants), range-capable file responses,
+    partial or empty responses, non-text content types and bodies under
+    ``minimum_size`` pass through untouched. Streamed bodies are flushed chunk by chunk so NDJSON lines
+    still reach the client as they are produced.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+class _CompressingSend:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.initial_message: Optional[Message] = None
+        self.stream = None
+        self.passthrough = False
+
+    def _compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        # Byte ranges and zero-copy sends address the file as stored
+        if "accept-ranges" in headers:
+            return False
+        return headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+            self.stream = _STREAMS[self.encoding](_DYNAMIC_LEVELS[self.encoding])
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            if not more_body:
+                body = self.stream.finish(body)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.initial_message)
+
+        chunk = self.stream.write(body) if more_body else self.stream.finish(body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
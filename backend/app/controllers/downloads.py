@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
-from app.schemas.download import DownloadCreate, DownloadUpdate, DownloadResponse
+from app.schemas.download import DownloadCreate, DownloadUpdate, DownloadResponse, ExportCreate
+from app.services.download_service import DownloadService, download_counter
+from app.services.export_service import ExportService, export_file_path
+from app.responses import file_response
 from app.auth import get_current_active_user
 from app.models.user import User
 
@@ -16,19 +19,26 @@ def create_download(
     db: Session = Depends(get_db)
 ):
     """Create a new download record"""
-    # TODO: Implement download creation logic
-    # This is a placeholder implementation
-    return {
-        "id": 1,
-        "filename": download.filename,
-        "file_path": download.file_path,
-        "file_size": download.file_size,
-        "content_type": download.content_type,
-        "user_id": current_user.id,
-        "download_count": 0,
-        "created_at": "2023-01-01T00:00:00",
-        "updated_at": "2023-01-01T00:00:00"
-    }
+    return DownloadService(db).create_download(download, user_id=current_user.id)
+
+@router.post("/exports", response_model=DownloadResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_export(
+    export: ExportCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a filtered export of planning permissions.
+
+    The download is returned as ``pending`` and becomes ``ready`` (or
+    ``failed``) once the background worker has written the file.
+    """
+    try:
+        return ExportService(db).request_export(export, user_id=current_user.id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
 
 @router.get("/", response_model=List[DownloadResponse])
 def get_downloads(
@@ -38,9 +48,7 @@ def get_downloads(
     db: Session = Depends(get_db)
 ):
     """Get all downloads for the current user"""
-    # TODO: Implement download retrieval logic
-    # This is a placeholder implementation
-    return []
+    return DownloadService(db).get_downloads(current_user.id, skip=skip, limit=limit)
 
 @router.get("/{download_id}", response_model=DownloadResponse)
 def get_download(
@@ -49,12 +57,13 @@ def get_download(
     db: Session = Depends(get_db)
 ):
     """Get a specific download by ID"""
-    # TODO: Implement download retrieval logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Download not found"
-    )
+    download = DownloadService(db).get_download(download_id, current_user.id)
+    if not download:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Download not found"
+        )
+    return download
 
 @router.put("/{download_id}", response_model=DownloadResponse)
 def update_download(
@@ -64,12 +73,13 @@ def update_download(
     db: Session = Depends(get_db)
 ):
     """Update a specific download"""
-    # TODO: Implement download update logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Download not found"
-    )
+    download = DownloadService(db).update_download(download_id, current_user.id, download_update)
+    if not download:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Download not found"
+        )
+    return download
 
 @router.delete("/{download_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_download(
@@ -78,23 +88,49 @@ def delete_download(
     db: Session = Depends(get_db)
 ):
     """Delete a specific download"""
-    # TODO: Implement download deletion logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Download not found"
-    )
+    if not ExportService(db).delete_download(download_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Download not found"
+        )
 
-@router.post("/{download_id}/download")
+@router.api_route("/{download_id}/download", methods=["GET", "HEAD", "POST"])
 def download_file(
     download_id: int,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
-):
-    """Download a file and increment download count"""
-    # TODO: Implement file download logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="File not found"
-    )
+) -> Response:
+    """Stream a download's file and count the download.
+
+    Supports ``Range`` requests (for resuming) and conditional requests via
+    ``ETag``/``Last-Modified``. Only responses that start the file count as
+    a download, so resumed or revalidated transfers are not double counted.
+    """
+    download = DownloadService(db).get_download(download_id, current_user.id)
+    if not download:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Download not found"
+        )
+    if download.status != "ready":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Download is {download.status}"
+        )
+    path = export_file_path(download.file_path) if download.file_path else None
+    try:
+        if path is None:
+            raise FileNotFoundError(download.file_path)
+        response = file_response(request, path, download.filename, download.content_type or "application/octet-stream")
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    if request.method != "HEAD" and (
+        response.status_code == status.HTTP_200_OK
+        or (response.status_code == status.HTTP_206_PARTIAL_CONTENT and response.offset == 0)
+    ):
+        download_counter.increment(download.id)
+    return response
@@ -1,73 +1,238 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
-from app.database import get_db
-from app.services.planning_permissions_service import PlanningPermissionsService
-from app.schemas.report import ReportCreate, ReportUpdate, ReportResponse
+from app.database import get_db, get_read_db
+from app.scheduler import sync_scheduler
+from app.throttle import CircuitOpenError
+from app.services.permission_record_service import PermissionRecordService
+from app.services.planning_permissions_service import upstream_guard
+from app.services.report_service import ReportService
+from app.services.search_index import get_search_index
+from app.services.aggregation import get_aggregates
+from app.schemas.report import GroupByField, ReportCreate, ReportUpdate, ReportResponse, PermissionFilter
 from app.auth import get_current_active_user
+from app.responses import cached_json_response, encode_json
 from app.models.user import User
-from app.models.planning_permission import PlanningPermissions
+from app.models.planning_permission import PlanningPermissions, Record, RegisterChanges, RegisterStats, SearchHit, SearchResults
 
 router = APIRouter()
 
-@router.post("/", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 500
+
+def _upstream_unavailable(exc: Exception) -> HTTPException:
+    """503 for a sync the upstream refused, with a hint of when to retry."""
+    if isinstance(exc, CircuitOpenError):
+        retry_after = exc.retry_after
+    else:
+        retry_after = upstream_guard.breaker.reset_timeout
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(exc) or "Upstream register unavailable",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+def _ndjson_lines(records: Iterable[Record]) -> Iterator[bytes]:
+    """Encode records as NDJSON, flushing every ``NDJSON_BATCH_SIZE`` lines."""
+    batch = []
+    for record in records:
+        batch.append(encode_json(record))
+        if len(batch) == NDJSON_BATCH_SIZE:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+@router.post("/", response_model=ReportResponse, status_code=status.HTTP_202_ACCEPTED)
 def create_report(
     report: ReportCreate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Create a new report"""
-    # TODO: Implement report creation logic
-    # This is a placeholder implementation
+    """Queue a report job; poll ``GET /{report_id}`` until it is done or failed"""
+    return ReportService(db).create_report(report, current_user.id)
+
+@router.get(
+    "/",
+    response_model=PlanningPermissions,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def get_reports(
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = "id",
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    filters: PermissionFilter = Depends(),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get a page of planning permissions from the local register.
+
+    With ``?stream=true`` or ``Accept: application/x-ndjson`` every matching
+    record is streamed as one JSON object per line instead; ``skip``,
+    ``limit`` and ``cursor`` are ignored.
+    """
+    record_service = PermissionRecordService(db)
+    version = await run_in_threadpool(record_service.get_version)
+    # Cold start: populate the local register before the first read
+    if not version:
+        try:
+            await sync_scheduler.ensure_populated()
+        except (CircuitOpenError, httpx.HTTPError) as exc:
+            raise _upstream_unavailable(exc)
+        version = await run_in_threadpool(record_service.get_version)
+    try:
+        record_service.parse_cursor(sort, cursor)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+    if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        records = record_service.iter_records(filters, sort)
+        return StreamingResponse(_ndjson_lines(records), media_type=NDJSON_MEDIA_TYPE)
+
+    async def build_page() -> PlanningPermissions:
+        return await run_in_threadpool(record_service.get_planning_permissions, skip, limit, filters, sort, cursor)
+
+    # Pages are serialised once per register version and served as bytes
+    key = ("reports", version, skip if cursor is None else None, limit, sort, cursor,
+           tuple(sorted(filters.model_dump(exclude_none=True).items())))
+    return await cached_json_response(request, key, build_page)
+
+@router.post("/sync")
+async def sync_reports(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Re-scrape the upstream register into the local database"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    try:
+        register_sync = await sync_scheduler.run_once()
+    except (CircuitOpenError, httpx.HTTPError) as exc:
+        raise _upstream_unavailable(exc)
+    if register_sync is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A sync is already running"
+        )
     return {
-        "id": 1,
-        "title": report.title,
-        "description": report.description,
-        "status": report.status,
-        "user_id": current_user.id,
-        "created_at": "2023-01-01T00:00:00",
-        "updated_at": "2023-01-01T00:00:00"
+        "cursor": register_sync.id,
+        "inserted": register_sync.inserted,
+        "updated": register_sync.updated,
+        "deleted": register_sync.deleted,
     }
 
-@router.get("/", response_model=PlanningPermissions)
-def get_reports(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user)
+@router.get("/sync")
+def get_sync_status(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ):
-    """Get all reports for the current user"""
-    # TODO: Implement report retrieval logic
-    # This is a placeholder implementation
-    response = PlanningPermissionsService().get_planning_permissions(skip, limit)
-    return response
+    """When the register was last synced, how long it took, and the scheduler state"""
+    last_sync = PermissionRecordService(db).get_last_sync()
+    return {
+        "last_sync": last_sync and {
+            "cursor": last_sync.id,
+            "started_at": last_sync.started_at,
+            "finished_at": last_sync.finished_at,
+            "duration_seconds": (last_sync.finished_at - last_sync.started_at).total_seconds(),
+            "inserted": last_sync.inserted,
+            "updated": last_sync.updated,
+            "deleted": last_sync.deleted,
+        },
+        "scheduler": sync_scheduler.status(),
+        "upstream": upstream_guard.status(),
+    }
 
-@router.get("/{report_id}", response_model=PlanningPermissions)
+@router.get("/changes", response_model=RegisterChanges)
+def get_report_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get planning permissions inserted, updated or removed after a sync cursor"""
+    try:
+        return PermissionRecordService(db).get_changes(since, limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc)
+        )
+
+@router.get("/search", response_model=SearchResults)
+def search_reports(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Ranked, typo-tolerant search over activity, duty holder and suburb"""
+    record_service = PermissionRecordService(db)
+    index = get_search_index(record_service.get_version(), record_service.get_records)
+    total, hits = index.search(q, limit)
+    return SearchResults(q, total, [SearchHit(score, record) for record, score in hits])
+
+@router.get("/stats", response_model=RegisterStats)
+async def get_report_stats(
+    request: Request,
+    group_by: List[GroupByField] = Query(["status"]),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Permission counts grouped by one or more fields; several fields give a cross-tab"""
+    record_service = PermissionRecordService(db)
+    version = await run_in_threadpool(record_service.get_version)
+    group_by = list(dict.fromkeys(group_by))
+
+    async def build_stats() -> RegisterStats:
+        aggregates = await run_in_threadpool(get_aggregates, version, record_service.get_records)
+        result = aggregates.get(group_by)
+        return RegisterStats(version, result["total"], result["groups"])
+
+    return await cached_json_response(request, ("stats", version, tuple(group_by)), build_stats)
+
+@router.get("/{report_id}", response_model=ReportResponse)
 def get_report(
     report_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ):
-    """Get a specific report by ID"""
-    # TODO: Implement report retrieval logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Report not found"
-    )
+    """Get a specific report, including its result once done"""
+    report = ReportService(db).get_report(report_id, current_user.id)
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    return report
 
-@router.put("/{report_id}", response_model=PlanningPermissions)
+@router.put("/{report_id}", response_model=ReportResponse)
 def update_report(
     report_id: int,
     report_update: ReportUpdate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ):
     """Update a specific report"""
-    # TODO: Implement report update logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Report not found"
-    )
+    report = ReportService(db).update_report(report_id, current_user.id, report_update)
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    return report
 
 @router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_report(
@@ -76,9 +241,8 @@ def delete_report(
     db: Session = Depends(get_db)
 ):
     """Delete a specific report"""
-    # TODO: Implement report deletion logic
-    # This is a placeholder implementation
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Report not found"
-    )
+    if not ReportService(db).delete_report(report_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
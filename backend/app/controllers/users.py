@@ -1,39 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from datetime import timedelta
 
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, Token
-from app.services.user_service import UserService
+from app.services.user_service import AsyncUserService
 from app.auth import create_access_token, get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.models.user import User
+from app.pagination import encode_cursor, decode_cursor
+from app.passwords import HasherBusyError
 
 router = APIRouter()
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password checks in progress; try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    user_service = UserService(db)
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
     
     # Check if user already exists
-    if user_service.get_user_by_email(user.email):
+    if await user_service.get_user_by_email(user.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    if user_service.get_user_by_username(user.username):
+    if await user_service.get_user_by_username(user.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
-    return user_service.create_user(user)
+    try:
+        return await user_service.create_user(user)
+    except HasherBusyError:
+        raise _hasher_busy()
 
 @router.post("/login", response_model=Token)
-def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user_service = UserService(db)
-    user = user_service.authenticate_user(form_data.username, form_data.password)
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user_service = AsyncUserService(db)
+    try:
+        user = await user_service.authenticate_user(form_data.username, form_data.password)
+    except HasherBusyError:
+        raise _hasher_busy()
     
     if not user:
         raise HTTPException(
@@ -49,17 +64,20 @@ def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @router.put("/me", response_model=UserResponse)
-def update_current_user(
+async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_service = UserService(db)
-    updated_user = user_service.update_user(current_user.id, user_update)
+    user_service = AsyncUserService(db)
+    try:
+        updated_user = await user_service.update_user(current_user.id, user_update)
+    except HasherBusyError:
+        raise _hasher_busy()
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,11 +86,13 @@ def update_current_user(
     return updated_user
 
 @router.get("/", response_model=List[UserResponse])
-def get_users(
-    skip: int = 0,
-    limit: int = 100,
+async def get_users(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     # Only superusers can list all users
     if not current_user.is_superuser:
@@ -81,14 +101,28 @@ def get_users(
             detail="Not enough permissions"
         )
     
-    user_service = UserService(db)
-    return user_service.get_users(skip=skip, limit=limit)
+    user_service = AsyncUserService(db)
+    if skip and cursor is None:
+        return await user_service.get_users(skip=skip, limit=limit)
+
+    # Keyset pagination: the next page starts after the last id returned
+    try:
+        after_id = int(decode_cursor(cursor, 1)[0]) if cursor else None
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    users = await user_service.get_users_after(after_id=after_id, limit=limit)
+    if users and len(users) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(users[-1].id)
+    return users
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     # Users can only view their own profile unless they're superuser
     if user_id != current_user.id and not current_user.is_superuser:
@@ -97,8 +131,8 @@ def get_user(
             detail="Not enough permissions"
         )
     
-    user_service = UserService(db)
-    user = user_service.get_user_by_id(user_id)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_id(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+class PoolMetrics:
+    """Checkout wait times and in-use connection counts for one pool."""
+
+    def __init__(self, window: int = 1024):
+        self.checkouts = 0
+        self.checkins = 0
+        self.peak_in_use = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self.checkouts - self.checkins
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def on_checkout(self, *_: Any) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def on_checkin(self, *_: Any) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats: Dict[str, Any] = {
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                # Over the most recent checkouts only
+                "wait_seconds_p50": round(waits[len(waits) // 2], 6) if waits else None,
+                "wait_seconds_p95": round(waits[int(len(waits) * 0.95)], 6) if waits else None,
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), overflow=pool.overflow(), idle=pool.checkedin())
+        return stats
+
+class _TimedPoolMixin:
+    """Times each checkout, including waits for a free connection."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument(engine: Engine) -> PoolMetrics:
+    """Attach ``PoolMetrics`` to a (sync) engine's pool."""
+    metrics = PoolMetrics()
+    engine.pool.metrics = metrics
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
+    return metrics
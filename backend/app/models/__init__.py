@@ -1,4 +1,7 @@
 from .user import User
+from .download import Download, ExportBlob
+from .report import Report
 from app.database import Base
-from .planning_permission import Record, PlanningPermissions
-__all__ = ["User", "Base", "Record", "PlanningPermissions"]
+from .planning_permission import Record, PlanningPermissions, SearchHit, SearchResults, RegisterChanges, RegisterStats, PermissionRecord, RegisterSync, SyncLease
+from .record_store import RecordStore, CompactPlanningPermissions
+__all__ = ["User", "Download", "ExportBlob", "Report", "Base", "Record", "PlanningPermissions", "SearchHit", "SearchResults", "RegisterChanges", "RegisterStats", "PermissionRecord", "RegisterSync", "SyncLease", "RecordStore", "CompactPlanningPermissions"]
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Download(Base):
+    __tablename__ = "downloads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String, nullable=False)
+    # Only set for exports; downloads created through the API have no file
+    file_path = Column(String, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
+    content_type = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="ready")
+    error = Column(String, nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    download_count = Column(Integer, nullable=False, default=0)
+    export_key = Column(String, nullable=True, index=True)
+    # The export request, so a pending export can be resubmitted after a restart
+    export_parameters = Column(JSON, nullable=True)
+    blob_id = Column(Integer, ForeignKey("export_blobs.id"), nullable=True, index=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ExportBlob(Base):
+    """A stored export file, shared by every download whose content hashes to ``digest``."""
+
+    __tablename__ = "export_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    digest = Column(String, nullable=False, unique=True)
+    file_path = Column(String, nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,9 +1,15 @@
-from typing import List
+import hashlib
+from typing import Dict, List, Optional, Union
 from typing import Any
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
+from sqlalchemy import Column, Index, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
 
 @dataclass
 class Record:
+    __slots__ = ("id", "permissionType", "status", "activity", "dutyHolder", "suburb", "postcode")
+
     id: str
     permissionType: str
     status: str
@@ -23,12 +29,17 @@ class Record:
         _postcode = str(obj.get("postcode"))
         return Record(_id, _permissionType, _status, _activity, _dutyHolder, _suburb, _postcode)
 
+    def fingerprint(self) -> str:
+        """Stable content hash used to detect changed records between syncs."""
+        return hashlib.sha256("\x1f".join(astuple(self)).encode("utf-8")).hexdigest()
+
 @dataclass
 class PlanningPermissions:
     total: int
     permissions: List[Record]
-    page: int
+    page: Optional[int]
     pageSize: int
+    nextCursor: Optional[str] = None
 
     @staticmethod
     def from_dict(obj: Any) -> 'PlanningPermissions':
@@ -36,4 +47,95 @@ class PlanningPermissions:
         _permissions = [Record.from_dict(y) for y in obj.get("records")]
         _page = int(obj.get("page"))
         _pageSize = int(obj.get("pageSize"))
-        return PlanningPermissions(_total, _permissions, _page, _pageSize)
\ No newline at end of file
+        return PlanningPermissions(_total, _permissions, _page, _pageSize)
+
+@dataclass
+class SearchHit:
+    score: float
+    record: Record
+
+@dataclass
+class SearchResults:
+    query: str
+    total: int
+    hits: List[SearchHit]
+
+@dataclass
+class RegisterChanges:
+    cursor: int
+    upserted: List[Record]
+    deleted: List[str]
+    nextCursor: Optional[str] = None
+
+@dataclass
+class RegisterStats:
+    version: int
+    total: int
+    groups: List[Dict[str, Union[str, int]]]
+
+class PermissionRecord(Base):
+    __tablename__ = "permission_records"
+
+    id = Column(String, primary_key=True)
+    permission_type = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    activity = Column(String, nullable=False)
+    duty_holder = Column(String, nullable=False, index=True)
+    suburb = Column(String, nullable=False)
+    postcode = Column(String, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    change_seq = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # (sort key, id) indexes serve both equality filters and keyset pagination
+    __table_args__ = (
+        Index("ix_permission_records_permission_type_id", "permission_type", "id"),
+        Index("ix_permission_records_status_id", "status", "id"),
+        Index("ix_permission_records_suburb_id", "suburb", "id"),
+        Index("ix_permission_records_postcode_id", "postcode", "id"),
+    )
+
+    @staticmethod
+    def row_from_record(record: Record) -> dict:
+        return {
+            "id": record.id,
+            "permission_type": record.permissionType,
+            "status": record.status,
+            "activity": record.activity,
+            "duty_holder": record.dutyHolder,
+            "suburb": record.suburb,
+            "postcode": record.postcode,
+            "fingerprint": record.fingerprint(),
+        }
+
+    def to_record(self) -> Record:
+        return Record(
+            self.id,
+            self.permission_type,
+            self.status,
+            self.activity,
+            self.duty_holder,
+            self.suburb,
+            self.postcode,
+        )
+
+class RegisterSync(Base):
+    __tablename__ = "register_syncs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    deleted = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class SyncLease(Base):
+    """A named lock held through the database, so it covers every worker process."""
+
+    __tablename__ = "sync_leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
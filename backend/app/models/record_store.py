@@ -0,0 +1,101 @@
+from array import array
+from collections.abc import Sequence
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from app.models.planning_permission import PlanningPermissions, Record
+
+class DictionaryColumn:
+    """A string column stored as integer codes into a list of distinct values."""
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes = array("I")
+        self._lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, position: int) -> str:
+        return self.values[self.codes[position]]
+
+    def append(self, value: str) -> None:
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def code_of(self, value: str) -> Optional[int]:
+        return self._lookup.get(value)
+
+class RecordStore(Sequence):
+    """Columnar, dictionary-encoded container of ``Record`` rows.
+
+    Ids are kept as a plain list; every other field is a ``DictionaryColumn``,
+    so repeated values such as status, suburb or duty holder are stored once
+    per snapshot. ``Record`` objects are only materialised on access.
+    """
+
+    COLUMNS = tuple(field.name for field in fields(Record) if field.name != "id")
+
+    def __init__(self, records: Iterable[Record] = ()):
+        self.ids: List[str] = []
+        self.columns: Dict[str, DictionaryColumn] = {name: DictionaryColumn() for name in self.COLUMNS}
+        for record in records:
+            self.append(record)
+
+    def append(self, record: Record) -> None:
+        self.ids.append(record.id)
+        for name, column in self.columns.items():
+            column.append(getattr(record, name))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[Record, List[Record]]:
+        if isinstance(position, slice):
+            return [self._record(index) for index in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("record index out of range")
+        return self._record(position)
+
+    def __iter__(self) -> Iterator[Record]:
+        return (self._record(position) for position in range(len(self)))
+
+    def _record(self, position: int) -> Record:
+        return Record(self.ids[position], *(self.columns[name][position] for name in self.COLUMNS))
+
+class CompactPlanningPermissions:
+    """``PlanningPermissions`` backed by a ``RecordStore``.
+
+    Exposes the same ``total``/``permissions``/``page``/``pageSize``
+    attributes; ``permissions`` materialises a list on access, so hot paths
+    should iterate ``records`` or take a ``page`` instead.
+    """
+
+    __slots__ = ("total", "records", "page", "pageSize")
+
+    def __init__(self, total: int, records: RecordStore, page: int, pageSize: int):
+        self.total = total
+        self.records = records
+        self.page = page
+        self.pageSize = pageSize
+
+    @property
+    def permissions(self) -> List[Record]:
+        return list(self.records)
+
+    @staticmethod
+    def from_dict(obj: Any) -> 'CompactPlanningPermissions':
+        records = RecordStore(Record.from_dict(y) for y in obj.get("records"))
+        return CompactPlanningPermissions(int(obj.get("total")), records, int(obj.get("page")), int(obj.get("pageSize")))
+
+    def to_planning_permissions(self, skip: int = 0, limit: Optional[int] = None) -> PlanningPermissions:
+        end = len(self.records) if limit is None else skip + limit
+        page = skip // limit + 1 if limit else 1
+        return PlanningPermissions(self.total, self.records[skip:end], page, limit or len(self.records))
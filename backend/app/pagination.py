@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Any, List
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset position values as an opaque, URL-safe cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises ``ValueError`` if the cursor is malformed or does not hold
+    ``length`` values.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+load_dotenv()
+
+# Raising the cost upgrades stored hashes as their users next log in
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Sync callers hold a request thread while they wait, so keep workers plus
+# queue well below AnyIO's 40-thread default
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "8"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+class HasherBusyError(Exception):
+    """Raised instead of queueing when the password hasher is saturated."""
+
+class PasswordHasher:
+    """Password hashing and verification on a dedicated, bounded thread pool.
+
+    bcrypt releases the GIL, so ``workers`` threads hash in parallel
+    without holding up the request threadpool's CPU share. At most
+    ``max_queue`` calls wait behind them; beyond that calls fail at once
+    with ``HasherBusyError`` rather than tying up request threads.
+    """
+
+    def __init__(self, context: CryptContext, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.context = context
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                raise HasherBusyError("Password hashing is saturated; try again shortly")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def hash(self, password: str) -> str:
+        return self._submit(self.context.hash, password).result()
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Check ``password``; on success also return a new hash if ``needs_update`` says so."""
+        return self._submit(self.context.verify_and_update, password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self.context.hash, password))
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self._submit(self.context.verify_and_update, password, hashed_password))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def status(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "max_queue": self.max_queue, "in_flight": self.in_flight}
+
+password_hasher = PasswordHasher(pwd_context)
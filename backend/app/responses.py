@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+from urllib.parse import quote
+
+import anyio
+import orjson
+from dotenv import load_dotenv
+from fastapi import Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+from app.cache import AsyncTTLCache, EncodedBody, etag_matches
+from app.compression import COMPRESSION_MIN_SIZE, available_encodings, compress, negotiate
+
+load_dotenv()
+
+# Keys include the register version, so entries never go stale; the TTL and
+# size only bound memory.
+BODY_CACHE_TTL_SECONDS = float(os.getenv("BODY_CACHE_TTL_SECONDS", "3600"))
+BODY_CACHE_MAX_ENTRIES = int(os.getenv("BODY_CACHE_MAX_ENTRIES", "128"))
+
+body_cache: AsyncTTLCache[EncodedBody] = AsyncTTLCache(
+    ttl=BODY_CACHE_TTL_SECONDS,
+    max_entries=BODY_CACHE_MAX_ENTRIES,
+    max_stale=0,
+)
+
+def encode_json(content: Any) -> bytes:
+    """Serialise dataclasses, dicts and lists straight to JSON bytes."""
+    return orjson.dumps(content)
+
+def encode_body(content: Any) -> EncodedBody:
+    """Serialise ``content`` once; compressed variants are added as they are requested."""
+    return EncodedBody.from_content(encode_json(content))
+
+async def cached_json_response(request: Request, key: Hashable, build: Callable[[], Awaitable[Any]]) -> Response:
+    """Serve ``build()`` as JSON, serialising and compressing it only once per ``key``.
+
+    ``key`` must change whenever the content would, e.g. by including the
+    register version. Only the coding negotiated from ``Accept-Encoding``
+    is compressed, on first request, and memoised on the cached body.
+    Requests whose ``If-None-Match`` carries one of the body's ETags get an
+    empty ``304 Not Modified``.
+    """
+    async def load() -> EncodedBody:
+        content = await build()
+        return await asyncio.to_thread(encode_body, content)
+
+    body = await body_cache.get_or_load(key, load)
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if len(body.content) < COMPRESSION_MIN_SIZE:
+        encoding = None
+    headers = {
+        "ETag": body.variant_etag(encoding),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if body.matches(request.headers.get("if-none-match"), available_encodings()):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding is None:
+        return Response(body.content, media_type="application/json", headers=headers)
+    variant = body.variants.get(encoding)
+    if variant is None:
+        # Racing first requests may both compress; the bytes are identical
+        variant = await asyncio.to_thread(compress, body.content, encoding)
+        body.variants[encoding] = variant
+    headers["Content-Encoding"] = encoding
+    return Response(variant, media_type="application/json", headers=headers)
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header: str, size: int) -> Union[Tuple[int, int], None, bool]:
+    """Parse a single-range ``Range`` header into inclusive ``(start, end)``.
+
+    Returns ``None`` for headers to ignore (malformed or multi-range, which
+    are answered with the whole file) and ``False`` if unsatisfiable.
+    """
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the final ``last`` bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, end
+
+class RangeFileResponse(Response):
+    """Send ``count`` bytes of a file starting at ``offset``.
+
+    Uses the ASGI ``http.response.zerocopysend`` extension (sendfile) when
+    the server offers it, ``http.response.pathsend`` for whole files, and
+    otherwise reads the file in ``chunk_size`` pieces.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        status_code: int = status.HTTP_200_OK,
+        headers: Optional[Dict[str, str]] = None,
+        media_type: Optional[str] = None,
+        send_body: bool = True,
+    ):
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.send_body = send_body
+        self.init_headers({**(headers or {}), "content-length": str(count)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            return
+        if "http.response.pathsend" in extensions and self.offset == 0 and self.count == os.path.getsize(self.path):
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank underneath us; end the response rather than hang
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def file_etag(stat_result: os.stat_result) -> str:
+    identity = f"{stat_result.st_ino}-{stat_result.st_size}-{stat_result.st_mtime_ns}"
+    return '"' + hashlib.sha256(identity.encode("ascii")).hexdigest()[:32] + '"'
+
+def _not_modified_since(if_modified_since: Optional[str], mtime: float) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return int(mtime) <= since.timestamp()
+
+def file_response(request: Request, path: str, filename: str, media_type: Optional[str] = None) -> Response:
+    """Serve a file with conditional GET and single-range ``Range`` support.
+
+    ``If-None-Match``/``If-Modified-Since`` may answer ``304``; a ``Range``
+    (honoured on GET/HEAD, guarded by ``If-Range``) answers ``206`` or
+    ``416``. Raises ``FileNotFoundError`` if ``path`` is missing.
+    """
+    stat_result = os.stat(path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    quoted = quote(filename)
+    disposition = f'attachment; filename="{filename}"' if quoted == filename else f"attachment; filename*=utf-8''{quoted}"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": disposition,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (
+        if_none_match is None and _not_modified_since(request.headers.get("if-modified-since"), stat_result.st_mtime)
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    send_body = request.method != "HEAD"
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and request.method in ("GET", "HEAD") and (if_range is None or if_range in (etag, last_modified)):
+        byte_range = parse_range(range_header, size)
+        if byte_range is False:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            return RangeFileResponse(
+                path, start, end - start + 1,
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+                media_type=media_type,
+                send_body=send_body,
+            )
+    return RangeFileResponse(path, 0, size, headers=headers, media_type=media_type, send_body=send_body)
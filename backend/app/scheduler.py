@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.planning_permission import RegisterSync, SyncLease
+from app.services.permission_record_service import PermissionRecordService
+from app.services.register_sync_service import RegisterSyncService
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the scheduler (e.g. on all but one of several API hosts)
+SYNC_INTERVAL_SECONDS = float(os.getenv("SYNC_INTERVAL_SECONDS", "3600"))
+SYNC_JITTER = float(os.getenv("SYNC_JITTER", "0.1"))
+SYNC_BACKOFF_BASE_SECONDS = float(os.getenv("SYNC_BACKOFF_BASE_SECONDS", "30"))
+SYNC_BACKOFF_MAX_SECONDS = float(os.getenv("SYNC_BACKOFF_MAX_SECONDS", "1800"))
+# How long a worker's claim on the register sync lasts without renewal
+SYNC_LEASE_SECONDS = float(os.getenv("SYNC_LEASE_SECONDS", "300"))
+
+_LEASE_NAME = "register_sync"
+
+class SyncScheduler:
+    """Periodically re-scrape the upstream register in the background.
+
+    Runs are spaced ``interval`` seconds apart, randomised by ``jitter`` so
+    that several workers drift apart. A failed run is retried after an
+    exponentially growing, fully jittered delay capped at ``backoff_max``.
+    Only one sync runs at a time across all workers: a run first claims a
+    lease row in the database, renewed while it runs, and is skipped while
+    another worker holds it. A scheduled run is also skipped when another
+    worker synced within the last half interval.
+    """
+
+    def __init__(
+        self,
+        interval: float = SYNC_INTERVAL_SECONDS,
+        jitter: float = SYNC_JITTER,
+        backoff_base: float = SYNC_BACKOFF_BASE_SECONDS,
+        backoff_max: float = SYNC_BACKOFF_MAX_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_seconds: float = SYNC_LEASE_SECONDS,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.next_run_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        self.next_run_at = None
+
+    def next_delay(self) -> float:
+        """Seconds until the next attempt, given the current failure streak."""
+        if self.consecutive_failures:
+            ceiling = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+            return random.uniform(0, ceiling)
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _last_sync(self) -> Optional[RegisterSync]:
+        db = self.session_factory()
+        try:
+            return PermissionRecordService(db).get_last_sync()
+        finally:
+            db.close()
+
+    async def is_due(self) -> bool:
+        last_sync = await run_in_threadpool(self._last_sync)
+        if last_sync is None:
+            return True
+        finished_at = last_sync.finished_at
+        if finished_at.tzinfo is None:
+            finished_at = finished_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - finished_at >= timedelta(seconds=self.interval / 2)
+
+    def _claim_lease(self) -> bool:
+        """Take or renew the sync lease; False while another worker holds it."""
+        now = datetime.now(timezone.utc)
+        db = self.session_factory()
+        try:
+            if db.get(SyncLease, _LEASE_NAME) is None:
+                try:
+                    db.add(SyncLease(name=_LEASE_NAME))
+                    db.commit()
+                except IntegrityError:
+                    # Created concurrently by another worker
+                    db.rollback()
+            claimed = db.execute(
+                update(SyncLease)
+                .where(
+                    SyncLease.name == _LEASE_NAME,
+                    or_(SyncLease.holder.is_(None), SyncLease.holder == self.holder, SyncLease.expires_at < now),
+                )
+                .values(holder=self.holder, expires_at=now + timedelta(seconds=self.lease_seconds))
+            ).rowcount
+            db.commit()
+            return claimed == 1
+        finally:
+            db.close()
+
+    def _release_lease(self) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(SyncLease)
+                .where(SyncLease.name == _LEASE_NAME, SyncLease.holder == self.holder)
+                .values(holder=None, expires_at=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _renew_lease(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await run_in_threadpool(self._claim_lease):
+                logger.warning("Lost the register sync lease while syncing")
+
+    async def _sync_leased(self, cached: bool = False) -> Optional[RegisterSync]:
+        """Sync under the database lease; ``None`` if another worker holds it."""
+        if not await run_in_threadpool(self._claim_lease):
+            return None
+        renewal = asyncio.create_task(self._renew_lease())
+        db = self.session_factory()
+        try:
+            return await RegisterSyncService(db).sync(cached=cached)
+        finally:
+            renewal.cancel()
+            db.close()
+            await run_in_threadpool(self._release_lease)
+
+    async def run_once(self) -> Optional[RegisterSync]:
+        """Sync now; returns ``None`` without waiting if a sync is already running here or elsewhere."""
+        if self._lock.locked():
+            return None
+        async with self._lock:
+            return await self._sync_leased()
+
+    def _version(self) -> int:
+        db = self.session_factory()
+        try:
+            return PermissionRecordService(db).get_version()
+        finally:
+            db.close()
+
+    async def ensure_populated(self) -> None:
+        """Fill an empty register, or wait for the sync already filling it.
+
+        Callers queue on the same lock as ``run_once``, so concurrent first
+        reads share one sync instead of each running their own. While
+        another worker holds the sync lease, this polls until that worker
+        has filled the register or its lease lapses.
+        """
+        async with self._lock:
+            while not await run_in_threadpool(self._version):
+                if await self._sync_leased(cached=True) is not None:
+                    return
+                await asyncio.sleep(1)
+
+    async def _run(self) -> None:
+        # The first check fills an empty or stale register straight away
+        delay = 0.0
+        while True:
+            self.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+            try:
+                if self.consecutive_failures or await self.is_due():
+                    await self.run_once()
+                self.consecutive_failures = 0
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Scheduled register sync failed")
+                self.consecutive_failures += 1
+                self.last_error = str(exc)[:500]
+            delay = self.next_delay()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.interval > 0,
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "next_run_at": self.next_run_at,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+sync_scheduler = SyncScheduler()
@@ -1,9 +1,9 @@
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin, Token
-from .report import ReportCreate, ReportUpdate, ReportResponse
-from .download import DownloadCreate, DownloadUpdate, DownloadResponse
+from .report import ReportCreate, ReportUpdate, ReportResponse, PermissionFilter
+from .download import DownloadCreate, DownloadUpdate, DownloadResponse, ExportCreate
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin", "Token",
-    "ReportCreate", "ReportUpdate", "ReportResponse",
-    "DownloadCreate", "DownloadUpdate", "DownloadResponse"
+    "ReportCreate", "ReportUpdate", "ReportResponse", "PermissionFilter",
+    "DownloadCreate", "DownloadUpdate", "DownloadResponse", "ExportCreate"
 ]
@@ -1,11 +1,13 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
+from app.schemas.report import PermissionFilter
+
+# Storage paths are server-side only: they are set by exports and never
+# accepted from or shown to clients
 class DownloadBase(BaseModel):
     filename: str
-    file_path: str
-    file_size: Optional[int] = None
     content_type: Optional[str] = None
 
 class DownloadCreate(DownloadBase):
@@ -13,16 +15,22 @@ class DownloadCreate(DownloadBase):
 
 class DownloadUpdate(BaseModel):
     filename: Optional[str] = None
-    file_path: Optional[str] = None
-    file_size: Optional[int] = None
     content_type: Optional[str] = None
 
 class DownloadResponse(DownloadBase):
     id: int
+    file_size: Optional[int] = None
     user_id: int
+    status: str = "ready"
+    error: Optional[str] = None
     download_count: int = 0
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+class ExportCreate(BaseModel):
+    format: Literal["csv", "parquet", "arrow"] = "csv"
+    sort: str = "id"
+    filters: PermissionFilter = PermissionFilter()
@@ -1,25 +1,41 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
+GroupByField = Literal["permissionType", "status", "activity", "dutyHolder", "suburb", "postcode"]
+
 class ReportBase(BaseModel):
     title: str
     description: Optional[str] = None
     status: str = "pending"
 
 class ReportCreate(ReportBase):
-    pass
+    group_by: List[GroupByField] = Field(default_factory=lambda: ["status"], min_length=1)
+    filters: "PermissionFilter" = Field(default_factory=lambda: PermissionFilter())
 
 class ReportUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    status: Optional[str] = None
 
 class ReportResponse(ReportBase):
     id: int
     user_id: int
+    parameters: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+class PermissionFilter(BaseModel):
+    status: Optional[str] = None
+    permission_type: Optional[str] = Field(None, alias="permissionType")
+    suburb: Optional[str] = None
+    postcode: Optional[str] = None
+    duty_holder: Optional[str] = Field(None, alias="dutyHolder")
+
+ReportCreate.model_rebuild()
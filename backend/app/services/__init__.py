@@ -1,4 +1,12 @@
 from .user_service import UserService
 from .planning_permissions_service import PlanningPermissionsService
+from .permission_record_service import PermissionRecordService
+from .register_sync_service import RegisterSyncService
+from .download_service import DownloadService
+from .export_service import ExportService
+from .report_service import ReportService
 
-__all__ = ["UserService", "PlanningPermissionsService"]
+__all__ = [
+    "UserService", "PlanningPermissionsService", "PermissionRecordService", "RegisterSyncService",
+    "DownloadService", "ExportService", "ReportService"
+]
@@ -0,0 +1,80 @@
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from app.models.planning_permission import Record
+from app.models.record_store import RecordStore
+
+# Breakdowns computed eagerly whenever the aggregates are rebuilt
+DIMENSIONS = ("status", "permissionType", "suburb", "postcode")
+
+def group_counts(store: RecordStore, group_by: Sequence[str]) -> Dict:
+    """Count rows per distinct combination of the ``group_by`` columns.
+
+    Works on the dictionary codes rather than materialised records: the
+    columns are zipped and counted in C, and each distinct key is decoded
+    back to its values once. Raises ``KeyError`` for an unknown column.
+    """
+    columns = [store.columns[field] for field in group_by]
+    counts = Counter(zip(*(column.codes for column in columns)))
+    groups = [
+        (tuple(column.values[code] for column, code in zip(columns, key)), count)
+        for key, count in counts.items()
+    ]
+    groups.sort(key=lambda item: (-item[1], item[0]))
+    return {
+        "total": len(store),
+        "groups": [dict(zip(group_by, values), count=count) for values, count in groups],
+    }
+
+class RecordAggregates:
+    """Materialised group-by counts over one register snapshot.
+
+    Single-column breakdowns for ``DIMENSIONS`` are computed up front; other
+    group-bys and cross-tabs are computed on first request and kept for the
+    life of the snapshot.
+    """
+
+    def __init__(self, records: Iterable[Record], version: Optional[int] = None):
+        self.version = version
+        if not isinstance(records, RecordStore):
+            records = RecordStore({record.id: record for record in records}.values())
+        self._store = records
+        self._results: Dict[Tuple[str, ...], Dict] = {}
+        self._lock = threading.Lock()
+        for field in DIMENSIONS:
+            self.get((field,))
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def get(self, group_by: Sequence[str]) -> Dict:
+        key = tuple(group_by)
+        result = self._results.get(key)
+        if result is None:
+            with self._lock:
+                result = self._results.get(key)
+                if result is None:
+                    result = self._results[key] = group_counts(self._store, key)
+        return result
+
+_aggregates: Optional[RecordAggregates] = None
+_aggregates_lock = threading.Lock()
+
+def get_aggregates(version: Optional[int], load_records: Callable[[], Iterable[Record]]) -> RecordAggregates:
+    """Return the worker's aggregates, rebuilding them once if ``version`` moved on."""
+    global _aggregates
+    aggregates = _aggregates
+    if aggregates is not None and aggregates.version == version:
+        return aggregates
+    with _aggregates_lock:
+        if _aggregates is None or _aggregates.version != version:
+            _aggregates = RecordAggregates(load_records(), version)
+        return _aggregates
+
+def rebuild_aggregates(records: Iterable[Record], version: Optional[int]) -> RecordAggregates:
+    global _aggregates
+    aggregates = RecordAggregates(records, version)
+    with _aggregates_lock:
+        _aggregates = aggregates
+    return aggregates
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.download import Download, ExportBlob
+
+logger = logging.getLogger(__name__)
+
+_READ_SIZE = 1024 * 1024
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content, read in 1MB pieces."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(_READ_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class BlobStore:
+    """Content-addressed, reference-counted file storage under ``root``.
+
+    Files with the same SHA-256 are stored once; each download pointing at
+    a blob holds one reference, and a blob's file is deleted with its last
+    reference. Every blob gets its own file name, so a blob being deleted
+    never races with an identical one being stored again.
+    """
+
+    def __init__(self, db: Session, root: str):
+        self.db = db
+        self.root = root
+
+    def put(self, path: str) -> ExportBlob:
+        """Move the file at ``path`` into the store and take a reference to its blob.
+
+        If the content is already stored, ``path`` is deleted instead. The
+        caller commits.
+        """
+        digest = file_digest(path)
+        blob = self._acquire_digest(digest)
+        if blob is not None:
+            _remove(path)
+            return blob
+        directory = os.path.join(self.root, digest[:2])
+        os.makedirs(directory, exist_ok=True)
+        extension = os.path.splitext(path.removesuffix(".part"))[1]
+        target = os.path.join(directory, f"{digest}-{uuid.uuid4().hex[:8]}{extension}")
+        size = os.path.getsize(path)
+        try:
+            with self.db.begin_nested():
+                blob = ExportBlob(digest=digest, file_path=target, file_size=size, ref_count=1)
+                self.db.add(blob)
+        except IntegrityError:
+            # Stored concurrently by another export
+            blob = self._acquire_digest(digest)
+            if blob is None:
+                raise
+            _remove(path)
+            return blob
+        os.replace(path, target)
+        return blob
+
+    def acquire(self, blob_id: int) -> Optional[ExportBlob]:
+        """Take a reference to a live blob, or ``None`` if it is being deleted."""
+        result = self.db.execute(
+            update(ExportBlob)
+            .where(ExportBlob.id == blob_id, ExportBlob.ref_count > 0)
+            .values(ref_count=ExportBlob.ref_count + 1)
+        )
+        if result.rowcount == 0:
+            return None
+        return self.db.get(ExportBlob, blob_id, populate_existing=True)
+
+    def _acquire_digest(self, digest: str) -> Optional[ExportBlob]:
+        blob_id = self.db.scalar(select(ExportBlob.id).where(ExportBlob.digest == digest))
+        return None if blob_id is None else self.acquire(blob_id)
+
+    def release(self, blob_id: int) -> bool:
+        """Drop a reference and commit; returns whether the blob was deleted."""
+        self.db.execute(
+            update(ExportBlob)
+            .where(ExportBlob.id == blob_id)
+            .values(ref_count=ExportBlob.ref_count - 1)
+        )
+        return bool(self._delete_unreferenced([blob_id]))
+
+    def collect_garbage(self) -> int:
+        """Recount references from ``downloads`` and delete unreferenced blobs.
+
+        Catches references dropped without ``release``, such as downloads
+        removed by a cascading user delete. Returns the blobs deleted.
+        """
+        references = (
+            select(func.count(Download.id))
+            .where(Download.blob_id == ExportBlob.id)
+            .scalar_subquery()
+        )
+        self.db.execute(update(ExportBlob).values(ref_count=references))
+        blob_ids = self.db.scalars(select(ExportBlob.id).where(ExportBlob.ref_count <= 0)).all()
+        return len(self._delete_unreferenced(blob_ids))
+
+    def _delete_unreferenced(self, blob_ids: List[int]) -> List[str]:
+        paths = []
+        for blob_id in blob_ids:
+            blob = self.db.get(ExportBlob, blob_id, populate_existing=True)
+            if blob is not None and blob.ref_count <= 0:
+                paths.append(blob.file_path)
+                self.db.delete(blob)
+        self.db.commit()
+        # Files go only once their rows are gone for good
+        for path in paths:
+            _remove(path)
+        if paths:
+            logger.info("Deleted %s unreferenced export blobs", len(paths))
+        return paths
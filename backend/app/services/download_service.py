@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.download import Download
+from app.schemas.download import DownloadCreate, DownloadUpdate
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_COUNT_FLUSH_SECONDS = float(os.getenv("DOWNLOAD_COUNT_FLUSH_SECONDS", "5"))
+
+class DownloadService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_download(self, download: DownloadCreate, user_id: int, status: str = "ready") -> Download:
+        db_download = Download(**download.model_dump(), user_id=user_id, status=status)
+        self.db.add(db_download)
+        self.db.commit()
+        self.db.refresh(db_download)
+        return db_download
+
+    def get_download(self, download_id: int, user_id: int) -> Optional[Download]:
+        return (
+            self.db.query(Download)
+            .filter(Download.id == download_id, Download.user_id == user_id)
+            .first()
+        )
+
+    def get_downloads(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Download]:
+        return (
+            self.db.query(Download)
+            .filter(Download.user_id == user_id)
+            .order_by(Download.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def update_download(self, download_id: int, user_id: int, download_update: DownloadUpdate) -> Optional[Download]:
+        db_download = self.get_download(download_id, user_id)
+        if not db_download:
+            return None
+        for field, value in download_update.model_dump(exclude_unset=True).items():
+            setattr(db_download, field, value)
+        self.db.commit()
+        self.db.refresh(db_download)
+        return db_download
+
+    def delete_download(self, download_id: int, user_id: int) -> bool:
+        db_download = self.get_download(download_id, user_id)
+        if not db_download:
+            return False
+        self.db.delete(db_download)
+        self.db.commit()
+        return True
+
+class DownloadCounter:
+    """Write-behind ``download_count`` increments.
+
+    Requests only bump an in-memory tally; a background task folds the
+    tallies into the table every ``interval`` seconds as one batched
+    ``download_count = download_count + n`` update, so concurrent
+    downloads neither block on nor contend for the row. Counts pending at
+    a crash are lost. An ``interval`` of 0 writes each increment through.
+    """
+
+    def __init__(self, interval: float = DOWNLOAD_COUNT_FLUSH_SECONDS, session_factory: Callable[[], Session] = SessionLocal):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def increment(self, download_id: int, count: int = 1) -> None:
+        with self._lock:
+            self._pending[download_id] = self._pending.get(download_id, 0) + count
+        if self.interval <= 0:
+            self.flush()
+
+    def pending(self, download_id: int) -> int:
+        with self._lock:
+            return self._pending.get(download_id, 0)
+
+    def flush(self) -> int:
+        """Write pending increments in one transaction; returns the downloads touched."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            db = self.session_factory()
+            try:
+                db.connection().execute(
+                    update(Download.__table__)
+                    .where(Download.__table__.c.id == bindparam("download_id"))
+                    .values(download_count=Download.__table__.c.download_count + bindparam("increment")),
+                    [{"download_id": download_id, "increment": count} for download_id, count in pending.items()],
+                )
+                db.commit()
+            finally:
+                db.close()
+        except Exception:
+            # Put the tallies back so the next flush retries them
+            with self._lock:
+                for download_id, count in pending.items():
+                    self._pending[download_id] = self._pending.get(download_id, 0) + count
+            raise
+        return len(pending)
+
+    def start(self) -> None:
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await run_in_threadpool(self.flush)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(self.flush)
+            except Exception:
+                logger.exception("Flushing download counts failed")
+
+download_counter = DownloadCounter()
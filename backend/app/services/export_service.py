@@ -0,0 +1,319 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import fields
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.download import Download, ExportBlob
+from app.models.planning_permission import Record
+from app.schemas.download import ExportCreate
+from app.services.blob_store import BlobStore
+from app.services.download_service import DownloadService
+from app.services.permission_record_service import SORT_COLUMNS, PermissionRecordService
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without the export extra
+    pa = None
+    pq = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "10000"))
+# An export running longer than this is assumed to have died with its worker
+EXPORT_STALE_SECONDS = float(os.getenv("EXPORT_STALE_SECONDS", "3600"))
+
+# format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", ".arrow"),
+}
+
+RECORD_FIELDS = [field.name for field in fields(Record)]
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+
+def available_formats() -> List[str]:
+    return [name for name in EXPORT_FORMATS if name == "csv" or pa is not None]
+
+def shutdown_export_workers() -> None:
+    _executor.shutdown(wait=True, cancel_futures=True)
+
+def _write_csv(records: Iterable[Record], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as output:
+        writer = csv.writer(output)
+        writer.writerow(RECORD_FIELDS)
+        batch = []
+        for record in records:
+            batch.append((record.id, record.permissionType, record.status, record.activity,
+                          record.dutyHolder, record.suburb, record.postcode))
+            if len(batch) == EXPORT_BATCH_SIZE:
+                writer.writerows(batch)
+                batch = []
+        writer.writerows(batch)
+
+def _arrow_batches(records: Iterable[Record], schema: "pa.Schema") -> Iterable["pa.RecordBatch"]:
+    columns: Dict[str, list] = {name: [] for name in RECORD_FIELDS}
+    size = 0
+    for record in records:
+        for name in RECORD_FIELDS:
+            columns[name].append(getattr(record, name))
+        size += 1
+        if size == EXPORT_BATCH_SIZE:
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+            columns = {name: [] for name in RECORD_FIELDS}
+            size = 0
+    if size:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+def _write_columnar(records: Iterable[Record], path: str, export_format: str) -> None:
+    schema = pa.schema([(name, pa.string()) for name in RECORD_FIELDS])
+    if export_format == "parquet":
+        # Parquet dictionary-encodes the repetitive columns on its own
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for batch in _arrow_batches(records, schema):
+                writer.write_batch(batch)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.ipc.new_file(path, schema, options=options) as writer:
+            for batch in _arrow_batches(records, schema):
+                writer.write_batch(batch)
+
+def export_key(version: int, export: ExportCreate) -> str:
+    """Identify an export by register version and parameters; equal keys mean equal files."""
+    parameters = {"version": version, **export.model_dump()}
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _blob_store(db: Session) -> BlobStore:
+    return BlobStore(db, os.path.join(EXPORT_DIR, "blobs"))
+
+def _find_export(db: Session, key: str) -> Optional[ExportBlob]:
+    """Take a reference to the stored file of a finished export with ``key``, if any."""
+    blob_ids = db.scalars(
+        select(Download.blob_id)
+        .where(Download.export_key == key, Download.status == "ready", Download.blob_id.is_not(None))
+        .distinct()
+    ).all()
+    store = _blob_store(db)
+    for blob_id in blob_ids:
+        blob = store.acquire(blob_id)
+        if blob is not None:
+            return blob
+    return None
+
+def _attach_blob(download: Download, blob: ExportBlob) -> None:
+    download.blob_id = blob.id
+    download.file_path = blob.file_path
+    download.file_size = blob.file_size
+    download.status = "ready"
+
+def _claim(db: Session, download_id: int) -> bool:
+    """Move a pending export to running; False if another worker got there first."""
+    claimed = db.execute(
+        update(Download)
+        .where(Download.id == download_id, Download.status == "pending")
+        .values(status="running", started_at=func.now())
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+def _attach_once(db: Session, download_id: int, blob: ExportBlob) -> None:
+    """Point a running export at ``blob``, dropping the reference if it already has one."""
+    attached = db.execute(
+        update(Download)
+        .where(Download.id == download_id, Download.blob_id.is_(None))
+        .values(blob_id=blob.id, file_path=blob.file_path, file_size=blob.file_size, status="ready")
+    ).rowcount
+    if attached == 0:
+        _blob_store(db).release(blob.id)
+
+def write_export(records: Iterable[Record], export_format: str, path: str) -> None:
+    """Write ``records`` to ``path`` in ``EXPORT_BATCH_SIZE`` chunks."""
+    if export_format not in available_formats():
+        raise ValueError(f"Export format not available: {export_format}")
+    if export_format == "csv":
+        _write_csv(records, path)
+    else:
+        _write_columnar(records, path, export_format)
+
+def run_export(download_id: int, export: ExportCreate, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    """Generate the file for a pending export and mark its download ready or failed.
+
+    Runs on the export worker pool with its own database session. The
+    pending -> running transition is a conditional update, so an export
+    queued twice (e.g. resubmitted on restart) is only generated once.
+    """
+    db = session_factory()
+    try:
+        if not _claim(db, download_id):
+            return
+        download = db.get(Download, download_id)
+        if download is None:
+            return
+        part_path = download.file_path + ".part"
+        try:
+            records_service = PermissionRecordService(db)
+            download.export_key = export_key(records_service.get_version(), export)
+            # An identical export may have finished since this one was queued
+            blob = _find_export(db, download.export_key)
+            if blob is None:
+                write_export(records_service.iter_records(export.filters, export.sort), export.format, part_path)
+                blob = _blob_store(db).put(part_path)
+            db.flush()
+            _attach_once(db, download_id, blob)
+        except Exception as exc:
+            logger.exception("Export %s failed", download_id)
+            db.rollback()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            download = db.get(Download, download_id)
+            if download is None:
+                # Deleted while generating
+                return
+            download.status = "failed"
+            download.error = str(exc)[:500]
+        db.commit()
+    finally:
+        db.close()
+
+def export_file_path(file_path: str) -> Optional[str]:
+    """Resolve ``file_path``, or ``None`` if it lies outside ``EXPORT_DIR``."""
+    export_dir = os.path.realpath(EXPORT_DIR)
+    real_path = os.path.realpath(file_path)
+    if os.path.commonpath([export_dir, real_path]) != export_dir:
+        return None
+    return real_path
+
+def discard_export_file(file_path: str) -> None:
+    """Remove a generated file; paths outside ``EXPORT_DIR`` are never touched."""
+    real_path = export_file_path(file_path)
+    if real_path is None:
+        return
+    try:
+        os.remove(real_path)
+    except FileNotFoundError:
+        pass
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def request_export(self, export: ExportCreate, user_id: int) -> Download:
+        """Register a pending download and queue its generation.
+
+        Raises ``ValueError`` for an unavailable format or unknown sort key.
+        """
+        if export.format not in available_formats():
+            raise ValueError(f"Export format not available: {export.format}")
+        if export.sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {export.sort}")
+
+        content_type, extension = EXPORT_FORMATS[export.format]
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        created = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        filename = f"planning-permissions-{created}{extension}"
+
+        # A repeat of a finished export just shares its file
+        key = export_key(PermissionRecordService(self.db).get_version(), export)
+        blob = _find_export(self.db, key)
+        if blob is not None:
+            download = Download(filename=filename, file_path=blob.file_path, content_type=content_type,
+                                user_id=user_id, export_key=key)
+            _attach_blob(download, blob)
+            self.db.add(download)
+            self.db.commit()
+            self.db.refresh(download)
+            return download
+
+        download = Download(
+            filename=filename,
+            file_path=os.path.join(EXPORT_DIR, f"{uuid.uuid4().hex}{extension}"),
+            content_type=content_type,
+            user_id=user_id,
+            status="pending",
+            export_key=key,
+            export_parameters=export.model_dump(mode="json", by_alias=True),
+        )
+        self.db.add(download)
+        self.db.commit()
+        self.db.refresh(download)
+        self.submit(download.id, export)
+        return download
+
+    def delete_download(self, download_id: int, user_id: int) -> bool:
+        """Delete a download, releasing the files its export owns.
+
+        A stored export drops its blob reference, so the file goes with the
+        last download sharing it; an unfinished export removes its own
+        working file. Downloads not created by an export own no files.
+        """
+        download_service = DownloadService(self.db)
+        download = download_service.get_download(download_id, user_id)
+        if not download:
+            return False
+        blob_id, export_key, file_path = download.blob_id, download.export_key, download.file_path
+        download_service.delete_download(download_id, user_id)
+        if blob_id is not None:
+            _blob_store(self.db).release(blob_id)
+        elif export_key is not None and file_path:
+            discard_export_file(file_path + ".part")
+        return True
+
+    def resume_pending(self, stale_after: float = EXPORT_STALE_SECONDS) -> int:
+        """Re-queue exports left pending by a previous process; returns how many.
+
+        Exports stuck ``running`` for over ``stale_after`` seconds lost their
+        worker and are reset to pending first; younger ones may still be
+        live on another API worker. Exports queued without their parameters
+        cannot be regenerated and are marked failed instead.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        stale = []
+        for download_id, started_at in (
+            self.db.query(Download.id, Download.started_at).filter(Download.status == "running")
+        ):
+            if started_at is not None and started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+            if started_at is None or started_at <= cutoff:
+                stale.append(download_id)
+        if stale:
+            logger.warning("Re-queueing %s exports orphaned while running", len(stale))
+            self.db.execute(
+                update(Download)
+                .where(Download.id.in_(stale), Download.status == "running")
+                .values(status="pending", started_at=None)
+            )
+            self.db.commit()
+        resumed = 0
+        for download in self.db.query(Download).filter(Download.status == "pending").all():
+            if download.export_parameters is None:
+                download.status = "failed"
+                download.error = "Interrupted by a restart"
+                continue
+            self.submit(download.id, ExportCreate.model_validate(download.export_parameters))
+            resumed += 1
+        self.db.commit()
+        return resumed
+
+    def collect_garbage(self) -> int:
+        """Delete stored export files no download refers to any more."""
+        return _blob_store(self.db).collect_garbage()
+
+    def submit(self, download_id: int, export: ExportCreate) -> Future:
+        return _executor.submit(run_export, download_id, export)
@@ -0,0 +1,276 @@
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.planning_permission import (
+    PermissionRecord,
+    PlanningPermissions,
+    Record,
+    RegisterChanges,
+    RegisterSync,
+)
+from app.models.record_store import RecordStore
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.report import PermissionFilter
+
+load_dotenv()
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+SORT_COLUMNS = {
+    "id": PermissionRecord.id,
+    "permissionType": PermissionRecord.permission_type,
+    "status": PermissionRecord.status,
+    "suburb": PermissionRecord.suburb,
+    "postcode": PermissionRecord.postcode,
+}
+
+# Column order matches the positional ``Record`` constructor
+_RECORD_COLUMNS = (
+    PermissionRecord.id,
+    PermissionRecord.permission_type,
+    PermissionRecord.status,
+    PermissionRecord.activity,
+    PermissionRecord.duty_holder,
+    PermissionRecord.suburb,
+    PermissionRecord.postcode,
+)
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+class PermissionRecordService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _live(self):
+        return self.db.query(PermissionRecord).filter(PermissionRecord.deleted_at.is_(None))
+
+    def _filtered(self, filters: Optional[PermissionFilter] = None):
+        query = self._live()
+        if filters is None:
+            return query
+        for field, value in filters.model_dump(exclude_none=True).items():
+            query = query.filter(getattr(PermissionRecord, field) == value)
+        return query
+
+    def ingest(self, records: Iterable[Record], change_seq: int = 0, batch_size: int = INGEST_BATCH_SIZE) -> int:
+        """Upsert records in multi-row ``INSERT ... ON CONFLICT`` batches.
+
+        Every written row is stamped with ``change_seq`` and un-tombstoned.
+        Returns the number of records written; the caller owns the commit.
+        """
+        insert = _UPSERT_DIALECTS[self.db.get_bind().dialect.name]
+        written = 0
+        for batch in _batched(records, batch_size):
+            # Upstream occasionally repeats a record across pages; a single
+            # statement may not touch the same row twice.
+            rows = list({
+                record.id: PermissionRecord.row_from_record(record) | {"change_seq": change_seq, "deleted_at": None}
+                for record in batch
+            }.values())
+            stmt = insert(PermissionRecord).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PermissionRecord.id],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in rows[0]
+                    if column != "id"
+                } | {"updated_at": func.now()},
+            )
+            self.db.execute(stmt)
+            written += len(rows)
+        return written
+
+    def sync(self, records: Iterable[Record], started_at: Optional[datetime] = None) -> RegisterSync:
+        """Apply a full upstream scrape as a delta against the stored register.
+
+        Only records whose fingerprint changed are written; records missing
+        from the scrape are tombstoned rather than deleted so that the change
+        feed can report them. Pass ``started_at`` when the sync began before
+        this call, e.g. with the upstream crawl.
+        """
+        stored: Dict[str, str] = dict(
+            self._live().with_entities(PermissionRecord.id, PermissionRecord.fingerprint)
+        )
+        incoming = {record.id: record for record in records}
+
+        changed = [
+            record for record_id, record in incoming.items()
+            if stored.get(record_id) != record.fingerprint()
+        ]
+        removed = [record_id for record_id in stored if record_id not in incoming]
+
+        register_sync = RegisterSync() if started_at is None else RegisterSync(started_at=started_at)
+        self.db.add(register_sync)
+        self.db.flush()
+
+        self.ingest(changed, change_seq=register_sync.id)
+        for batch in _batched(removed, INGEST_BATCH_SIZE):
+            self.db.query(PermissionRecord).filter(PermissionRecord.id.in_(batch)).update(
+                {"deleted_at": func.now(), "change_seq": register_sync.id},
+                synchronize_session=False,
+            )
+
+        register_sync.inserted = sum(1 for record in changed if record.id not in stored)
+        register_sync.updated = len(changed) - register_sync.inserted
+        register_sync.deleted = len(removed)
+        register_sync.finished_at = func.now()
+        self.db.commit()
+        self.db.refresh(register_sync)
+        return register_sync
+
+    def get_last_sync(self) -> Optional[RegisterSync]:
+        return (
+            self.db.query(RegisterSync)
+            .filter(RegisterSync.finished_at.isnot(None))
+            .order_by(RegisterSync.id.desc())
+            .first()
+        )
+
+    def get_version(self) -> int:
+        """The latest change sequence applied to the register (0 when empty)."""
+        return self.db.query(func.max(PermissionRecord.change_seq)).scalar() or 0
+
+    def iter_records(self, filters: Optional[PermissionFilter] = None, sort: str = "id") -> Iterator[Record]:
+        """Yield every matching live record in ``(sort, id)`` order.
+
+        Rows are fetched in batches of ``INGEST_BATCH_SIZE`` so memory stays
+        bounded however many records match.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        rows = (
+            self._filtered(filters)
+            .with_entities(*_RECORD_COLUMNS)
+            .order_by(SORT_COLUMNS[sort], PermissionRecord.id)
+            .yield_per(INGEST_BATCH_SIZE)
+        )
+        return (Record(*row) for row in rows)
+
+    def get_records(self) -> RecordStore:
+        """Load every live record into a compact columnar store."""
+        return RecordStore(self.iter_records())
+
+    def count(self) -> int:
+        return self._live().with_entities(func.count(PermissionRecord.id)).scalar()
+
+    @staticmethod
+    def parse_cursor(sort: str, cursor: Optional[str]) -> Optional[Tuple[str, str]]:
+        """Validate a page request, returning the cursor's ``(value, id)`` position.
+
+        Raises ``ValueError`` for an unknown sort key, a malformed cursor or
+        one issued for a different sort.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if cursor is None:
+            return None
+        cursor_sort, value, record_id = decode_cursor(cursor, 3)
+        if cursor_sort != sort:
+            raise ValueError("Cursor was issued for a different sort")
+        if not isinstance(value, str) or not isinstance(record_id, str):
+            raise ValueError("Invalid cursor")
+        return value, record_id
+
+    def get_planning_permissions(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[PermissionFilter] = None,
+        sort: str = "id",
+        cursor: Optional[str] = None,
+    ) -> PlanningPermissions:
+        """Return one page of live records matching ``filters``.
+
+        Pages are ordered by ``(sort, id)``. With a ``cursor`` the page is
+        located by keyset instead of ``skip``, so deep pages cost the same as
+        the first; ``page`` is then ``None``. ``total`` is the number of
+        matching records. Raises ``ValueError`` for an unknown sort key or a
+        cursor issued for a different sort.
+        """
+        position = self.parse_cursor(sort, cursor)
+        column = SORT_COLUMNS[sort]
+        query = self._filtered(filters)
+        total = query.with_entities(func.count(PermissionRecord.id)).scalar()
+        query = query.order_by(column, PermissionRecord.id)
+
+        if position is None:
+            query = query.offset(skip)
+            page = skip // limit + 1
+        else:
+            value, record_id = position
+            if sort == "id":
+                query = query.filter(PermissionRecord.id > record_id)
+            else:
+                query = query.filter(tuple_(column, PermissionRecord.id) > tuple_(value, record_id))
+            page = None
+
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, getattr(last, column.key), last.id)
+        return PlanningPermissions(total, [row.to_record() for row in rows], page, limit, next_cursor)
+
+    @staticmethod
+    def parse_changes_cursor(cursor: Optional[str]) -> Optional[Tuple[int, str]]:
+        """Decode a change feed cursor into its ``(change_seq, id)`` position.
+
+        Raises ``ValueError`` for a malformed cursor.
+        """
+        if cursor is None:
+            return None
+        change_seq, record_id = decode_cursor(cursor, 2)
+        if not isinstance(change_seq, int) or not isinstance(record_id, str):
+            raise ValueError("Invalid cursor")
+        return change_seq, record_id
+
+    def get_changes(self, since: int = 0, limit: int = 1000, cursor: Optional[str] = None) -> RegisterChanges:
+        """Return up to ``limit`` records inserted, updated or tombstoned after ``since``.
+
+        Changes are ordered by ``(change_seq, id)``; when more remain,
+        ``nextCursor`` continues the feed from the last one returned. The
+        returned ``cursor`` is a safe ``since`` for the next poll: while
+        pages remain it only covers syncs delivered in full. Raises
+        ``ValueError`` for a malformed cursor.
+        """
+        position = self.parse_changes_cursor(cursor)
+        query = self.db.query(PermissionRecord)
+        if position is None:
+            query = query.filter(PermissionRecord.change_seq > since)
+        else:
+            query = query.filter(tuple_(PermissionRecord.change_seq, PermissionRecord.id) > tuple_(*position))
+        rows = query.order_by(PermissionRecord.change_seq, PermissionRecord.id).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last.change_seq, last.id)
+            # Later rows of the last sync are still to come
+            sync_cursor = max(since, last.change_seq - 1)
+        elif rows:
+            sync_cursor = max(since, rows[-1].change_seq)
+        else:
+            sync_cursor = since if position is None else max(since, position[0])
+        return RegisterChanges(
+            cursor=sync_cursor,
+            upserted=[row.to_record() for row in rows if row.deleted_at is None],
+            deleted=[row.id for row in rows if row.deleted_at is not None],
+            nextCursor=next_cursor,
+        )
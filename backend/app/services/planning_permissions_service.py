@@ -1,10 +1,244 @@
-import requests
-from app.models.planning_permission import PlanningPermissions
+import asyncio
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import ijson
+from dotenv import load_dotenv
+
+from app.cache import AsyncTTLCache, DiskResponseCache, Validators
+from app.throttle import AdaptiveLimiter, CircuitBreaker, TokenBucket, UpstreamGuard
+from app.models.planning_permission import Record
+from app.models.record_store import CompactPlanningPermissions, RecordStore
+
+load_dotenv()
+
+EPA_REGISTER_URL = os.getenv("EPA_REGISTER_URL", "https://www.epa.vic.gov.au/api/public-register/permissions")
+# Permission types granted under the Environment Protection Act 2017; the
+# register has no endpoint listing them, so the crawl takes them from config.
+EPA_PERMISSION_TYPES = [
+    permission_type.strip()
+    for permission_type in os.getenv(
+        "EPA_PERMISSION_TYPES",
+        "Development licence,Operating licence,Pilot project licence,Permit,Registration",
+    ).split(",")
+    if permission_type.strip()
+]
+EPA_PAGE_SIZE = int(os.getenv("EPA_PAGE_SIZE", "1000"))
+EPA_MAX_CONCURRENCY = int(os.getenv("EPA_MAX_CONCURRENCY", "8"))
+EPA_TIMEOUT_SECONDS = float(os.getenv("EPA_TIMEOUT_SECONDS", "30"))
+EPA_MIN_CONCURRENCY = int(os.getenv("EPA_MIN_CONCURRENCY", "1"))
+EPA_INITIAL_CONCURRENCY = int(os.getenv("EPA_INITIAL_CONCURRENCY", "4"))
+EPA_LATENCY_TOLERANCE = float(os.getenv("EPA_LATENCY_TOLERANCE", "2.0"))
+EPA_REQUESTS_PER_SECOND = float(os.getenv("EPA_REQUESTS_PER_SECOND", "10"))
+EPA_MAX_ATTEMPTS = int(os.getenv("EPA_MAX_ATTEMPTS", "4"))
+EPA_RETRY_BASE_SECONDS = float(os.getenv("EPA_RETRY_BASE_SECONDS", "0.5"))
+EPA_RETRY_MAX_SECONDS = float(os.getenv("EPA_RETRY_MAX_SECONDS", "20"))
+EPA_BREAKER_THRESHOLD = int(os.getenv("EPA_BREAKER_THRESHOLD", "5"))
+EPA_BREAKER_RESET_SECONDS = float(os.getenv("EPA_BREAKER_RESET_SECONDS", "60"))
+REGISTER_CACHE_TTL_SECONDS = float(os.getenv("REGISTER_CACHE_TTL_SECONDS", "300"))
+REGISTER_CACHE_MAX_STALE_SECONDS = float(os.getenv("REGISTER_CACHE_MAX_STALE_SECONDS", "3600"))
+REGISTER_CACHE_MAX_ENTRIES = int(os.getenv("REGISTER_CACHE_MAX_ENTRIES", "16"))
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", os.path.join(".cache", "epa-register"))
+
+register_cache: AsyncTTLCache[CompactPlanningPermissions] = AsyncTTLCache(
+    ttl=REGISTER_CACHE_TTL_SECONDS,
+    max_entries=REGISTER_CACHE_MAX_ENTRIES,
+    max_stale=REGISTER_CACHE_MAX_STALE_SECONDS,
+)
+
+# Shared by every service instance so all callers respect one upstream budget
+upstream_guard = UpstreamGuard(
+    bucket=TokenBucket(EPA_REQUESTS_PER_SECOND, burst=EPA_MAX_CONCURRENCY),
+    limiter=AdaptiveLimiter(
+        EPA_INITIAL_CONCURRENCY,
+        minimum=EPA_MIN_CONCURRENCY,
+        maximum=EPA_MAX_CONCURRENCY,
+        tolerance=EPA_LATENCY_TOLERANCE,
+    ),
+    breaker=CircuitBreaker(EPA_BREAKER_THRESHOLD, EPA_BREAKER_RESET_SECONDS),
+    max_attempts=EPA_MAX_ATTEMPTS,
+    retry_base=EPA_RETRY_BASE_SECONDS,
+    retry_max=EPA_RETRY_MAX_SECONDS,
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client used for all upstream register calls."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=EPA_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=EPA_MAX_CONCURRENCY,
+                max_keepalive_connections=EPA_MAX_CONCURRENCY,
+            ),
+            headers={"Accept": "application/json"},
+        )
+    return _client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+class _PageDecoder:
+    """Push parser turning a register page into ``Record`` objects as bytes arrive.
+
+    Only one record's fields are held at a time, so memory stays flat
+    regardless of page size.
+    """
+
+    _SCALARS = {"string", "number", "boolean", "null"}
+    _RECORD_PREFIX = "records.item"
+    _FIELD_PREFIX = "records.item."
+
+    def __init__(self, on_record: Callable[[Record], None]):
+        self.on_record = on_record
+        self.meta: Dict[str, Any] = {}
+        self._events = ijson.sendable_list()
+        self._parser = ijson.parse_coro(self._events)
+        self._current: Optional[Dict[str, Any]] = None
+
+    def feed(self, chunk: bytes) -> None:
+        self._parser.send(chunk)
+        self._drain()
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing and return the page metadata (total, page, pageSize)."""
+        self._parser.close()
+        self._drain()
+        return self.meta
+
+    def _drain(self) -> None:
+        for prefix, event, value in self._events:
+            if prefix == self._RECORD_PREFIX:
+                if event == "start_map":
+                    self._current = {}
+                elif event == "end_map":
+                    self.on_record(Record.from_dict(self._current))
+                    self._current = None
+            elif prefix.startswith(self._FIELD_PREFIX):
+                if event in self._SCALARS and self._current is not None:
+                    self._current[prefix[len(self._FIELD_PREFIX):]] = value
+            elif "." not in prefix and event in self._SCALARS:
+                self.meta[prefix] = value
+        del self._events[:]
 
 class PlanningPermissionsService:
-    def __init__(self):
-        pass
-    
-    def get_planning_permissions(self, skip: int = 0, limit: int = 100):
-        results = requests.get("https://www.epa.vic.gov.au/api/public-register/permissions?permissionType=Development+licence&page=1&pageSize=1000")
-        return PlanningPermissions.from_dict(results.json())
\ No newline at end of file
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        permission_types: Optional[Sequence[str]] = None,
+        page_size: int = EPA_PAGE_SIZE,
+        max_concurrency: int = EPA_MAX_CONCURRENCY,
+        cache: Optional[AsyncTTLCache[CompactPlanningPermissions]] = None,
+        response_cache: Optional[DiskResponseCache] = None,
+        guard: Optional[UpstreamGuard] = None,
+    ):
+        self.client = client or get_http_client()
+        self.permission_types = list(dict.fromkeys(permission_types or EPA_PERMISSION_TYPES))
+        self.page_size = page_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache if cache is not None else register_cache
+        self.response_cache = response_cache or DiskResponseCache(RESPONSE_CACHE_DIR)
+        self.guard = guard or upstream_guard
+
+    async def fetch_page(self, page: int, permission_type: Optional[str] = None) -> Tuple[Dict[str, Any], RecordStore]:
+        """Stream one register page of ``permission_type`` into a ``RecordStore``.
+
+        ``permission_type`` defaults to the first configured type.
+
+        The body is decoded incrementally as it arrives, then compressed to
+        the on-disk cache on a worker thread. Stored ETag/Last-Modified validators
+        are sent as conditional headers; on ``304 Not Modified`` the cached
+        body is replayed instead of downloading the page again. Returns the
+        page metadata (``total``, ``page``, ``pageSize``) and its records.
+
+        Calls go through the upstream guard: rate-limited, adaptively
+        concurrency-limited, retried on 429/5xx/transport errors, and
+        rejected with ``CircuitOpenError`` while upstream is failing.
+        """
+        permission_type = permission_type or self.permission_types[0]
+        return await self.guard.run(lambda: self._fetch_page(page, permission_type))
+
+    async def _fetch_page(self, page: int, permission_type: str) -> Tuple[Dict[str, Any], RecordStore]:
+        params = {
+            "permissionType": permission_type,
+            "page": page,
+            "pageSize": self.page_size,
+        }
+        key = self.response_cache.key(EPA_REGISTER_URL, params)
+        validators = await asyncio.to_thread(self.response_cache.load_validators, key)
+        headers = validators.request_headers() if validators else {}
+
+        while True:
+            records = RecordStore()
+            decoder = _PageDecoder(records.append)
+            async with self.client.stream("GET", EPA_REGISTER_URL, params=params, headers=headers) as response:
+                if response.status_code == httpx.codes.NOT_MODIFIED and headers:
+                    if await asyncio.to_thread(self.response_cache.replay, key, decoder.feed):
+                        return decoder.close(), records
+                    # Validators without a body: fall back to an unconditional fetch
+                    headers = {}
+                    continue
+
+                response.raise_for_status()
+                fresh = Validators(response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                if not (fresh.etag or fresh.last_modified):
+                    async for chunk in response.aiter_bytes():
+                        decoder.feed(chunk)
+                    return decoder.close(), records
+
+                # Compression and disk writes stay off the event loop, like the reads above
+                chunks = []
+                async for chunk in response.aiter_bytes():
+                    decoder.feed(chunk)
+                    chunks.append(chunk)
+                meta = decoder.close()
+                await asyncio.to_thread(self.response_cache.store, key, fresh, chunks)
+                return meta, records
+
+    async def crawl(self) -> CompactPlanningPermissions:
+        """Fetch every page of every configured permission type.
+
+        All types are crawled at once: each type's first page tells us its
+        ``total`` and effective ``pageSize``, and its remaining pages are
+        then requested straight away. Every request shares one
+        ``max_concurrency`` budget, so a multi-type crawl takes about as
+        long as its largest type rather than the sum of all of them.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_bounded(permission_type: str, page: int) -> Tuple[Dict[str, Any], RecordStore]:
+            async with semaphore:
+                return await self.fetch_page(page, permission_type)
+
+        async def crawl_type(permission_type: str) -> List[RecordStore]:
+            first_meta, first_records = await fetch_bounded(permission_type, 1)
+            total = int(first_meta.get("total") or 0)
+            page_size = int(first_meta.get("pageSize") or self.page_size)
+            page_count = math.ceil(total / page_size) if page_size > 0 else 1
+            rest = await asyncio.gather(*(fetch_bounded(permission_type, page) for page in range(2, page_count + 1)))
+            return [first_records, *(page_records for _, page_records in rest)]
+
+        crawled = await asyncio.gather(*(crawl_type(permission_type) for permission_type in self.permission_types))
+
+        # Pages can shift while we crawl; keep the first copy of a repeated id
+        seen = set()
+        records = RecordStore()
+        for pages in crawled:
+            for page_records in pages:
+                for record in page_records:
+                    if record.id not in seen:
+                        seen.add(record.id)
+                        records.append(record)
+        # Upstream totals count a repeated id once per type; report what was kept
+        return CompactPlanningPermissions(len(records), records, 1, len(records))
+
+    async def get_planning_permissions(self, skip: int = 0, limit: int = 100) -> CompactPlanningPermissions:
+        """Return the register through the shared stale-while-revalidate cache."""
+        return await self.cache.get_or_load((tuple(self.permission_types), self.page_size), self.crawl)
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.models.planning_permission import RegisterSync
+from app.services.aggregation import rebuild_aggregates
+from app.services.permission_record_service import PermissionRecordService
+from app.services.planning_permissions_service import PlanningPermissionsService
+from app.services.search_index import rebuild_search_index
+
+class RegisterSyncService:
+    """Pull the upstream register and persist it locally."""
+
+    def __init__(self, db: Session, upstream: Optional[PlanningPermissionsService] = None):
+        self.records = PermissionRecordService(db)
+        self.upstream = upstream or PlanningPermissionsService()
+
+    async def sync(self, cached: bool = False) -> RegisterSync:
+        """Apply the upstream register to the local database.
+
+        With ``cached`` the scrape may come from the shared register cache,
+        so concurrent cold-start callers coalesce onto one upstream fetch.
+        """
+        started_at = datetime.now(timezone.utc)
+        if cached:
+            snapshot = await self.upstream.get_planning_permissions()
+        else:
+            snapshot = await self.upstream.crawl()
+        register_sync = await run_in_threadpool(self.records.sync, snapshot.records, started_at)
+        if register_sync.inserted or register_sync.updated or register_sync.deleted:
+            await run_in_threadpool(rebuild_search_index, snapshot.records, register_sync.id)
+            await run_in_threadpool(rebuild_aggregates, snapshot.records, register_sync.id)
+        return register_sync
@@ -0,0 +1,170 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.record_store import RecordStore
+from app.models.report import Report
+from app.schemas.report import PermissionFilter, ReportCreate, ReportUpdate
+from app.services.aggregation import group_counts
+from app.services.permission_record_service import PermissionRecordService
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "process" keeps aggregation off the API workers' GIL; "thread" suits
+# single-process deployments and SQLite.
+REPORT_WORKER_BACKEND = os.getenv("REPORT_WORKER_BACKEND", "process")
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# A job running longer than this is assumed to have died with its worker
+REPORT_STALE_SECONDS = float(os.getenv("REPORT_STALE_SECONDS", "3600"))
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if REPORT_WORKER_BACKEND == "process":
+                # Forking a process running asyncio, threads and pooled
+                # connections copies their state mid-flight; start clean instead
+                _executor = ProcessPoolExecutor(
+                    max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("forkserver")
+                )
+            else:
+                _executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+        return _executor
+
+def shutdown_report_workers() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+def _claim(db: Session, report_id: int) -> bool:
+    """Move a pending report to running; False if another worker got there first."""
+    claimed = (
+        db.query(Report)
+        .filter(Report.id == report_id, Report.status == "pending")
+        .update({"status": "running", "started_at": func.now()}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+def run_report(report_id: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    """Compute a pending report and mark it done or failed.
+
+    Runs on the report worker pool with its own database session. The
+    pending -> running transition is a conditional update, so a job queued
+    twice (e.g. resubmitted on restart) is only computed once.
+    """
+    db = session_factory()
+    try:
+        if not _claim(db, report_id):
+            return
+        report = db.get(Report, report_id)
+        try:
+            filters = PermissionFilter(**report.parameters.get("filters", {}))
+            records = RecordStore(PermissionRecordService(db).iter_records(filters))
+            report.result = group_counts(records, report.parameters["group_by"])
+            report.status = "done"
+        except Exception as exc:
+            logger.exception("Report %s failed", report_id)
+            db.rollback()
+            report = db.get(Report, report_id)
+            if report is None:
+                return
+            report.status = "failed"
+            report.error = str(exc)[:500]
+        report.finished_at = func.now()
+        db.commit()
+    finally:
+        db.close()
+
+class ReportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_report(self, report: ReportCreate, user_id: int) -> Report:
+        """Persist a pending report job and queue it for the worker pool."""
+        db_report = Report(
+            title=report.title,
+            description=report.description,
+            status="pending",
+            parameters={
+                "group_by": list(report.group_by),
+                "filters": report.filters.model_dump(by_alias=True, exclude_none=True),
+            },
+            user_id=user_id,
+        )
+        self.db.add(db_report)
+        self.db.commit()
+        self.db.refresh(db_report)
+        self.submit(db_report.id)
+        return db_report
+
+    def get_report(self, report_id: int, user_id: int) -> Optional[Report]:
+        return (
+            self.db.query(Report)
+            .filter(Report.id == report_id, Report.user_id == user_id)
+            .first()
+        )
+
+    def update_report(self, report_id: int, user_id: int, report_update: ReportUpdate) -> Optional[Report]:
+        db_report = self.get_report(report_id, user_id)
+        if not db_report:
+            return None
+        for field, value in report_update.model_dump(exclude_unset=True).items():
+            setattr(db_report, field, value)
+        self.db.commit()
+        self.db.refresh(db_report)
+        return db_report
+
+    def delete_report(self, report_id: int, user_id: int) -> bool:
+        db_report = self.get_report(report_id, user_id)
+        if not db_report:
+            return False
+        self.db.delete(db_report)
+        self.db.commit()
+        return True
+
+    def resume_pending(self, stale_after: float = REPORT_STALE_SECONDS) -> int:
+        """Re-queue reports left pending by a previous process; returns how many.
+
+        Reports stuck ``running`` for over ``stale_after`` seconds lost their
+        worker and are reset to pending first. Younger running jobs may
+        still be live on another API worker and are left alone.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+        stale = []
+        for report_id, started_at in self.db.query(Report.id, Report.started_at).filter(Report.status == "running"):
+            if started_at is not None and started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)
+            if started_at is None or started_at <= cutoff:
+                stale.append(report_id)
+        if stale:
+            logger.warning("Re-queueing %s reports orphaned while running", len(stale))
+            (
+                self.db.query(Report)
+                .filter(Report.id.in_(stale), Report.status == "running")
+                .update({"status": "pending", "started_at": None}, synchronize_session=False)
+            )
+            self.db.commit()
+        pending = [report_id for (report_id,) in self.db.query(Report.id).filter(Report.status == "pending")]
+        for report_id in pending:
+            self.submit(report_id)
+        return len(pending)
+
+    def submit(self, report_id: int) -> Future:
+        return _get_executor().submit(run_report, report_id)
@@ -0,0 +1,150 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.planning_permission import Record
+from app.models.record_store import RecordStore
+
+# Field weights: a hit on the duty holder outranks one buried in the activity text
+SEARCH_FIELDS = {
+    "dutyHolder": 2.0,
+    "suburb": 1.5,
+    "activity": 1.0,
+}
+MIN_SIMILARITY = 0.4
+MAX_EXPANSIONS = 8
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class RecordSearchIndex:
+    """In-process inverted index over record text with typo-tolerant lookup.
+
+    Query terms match vocabulary tokens exactly, by prefix, or by trigram
+    similarity (so ``"gelong"`` still finds ``"geelong"``). Every query term
+    must match; results are ranked by field-weighted IDF scaled by how
+    closely each term matched.
+    """
+
+    def __init__(self, records: Iterable[Record], version: Optional[int] = None):
+        self.version = version
+        # Later duplicates of an id replace earlier ones, as on ingest
+        if not isinstance(records, RecordStore):
+            records = RecordStore({record.id: record for record in records}.values())
+        self._store = records
+        # Postings are keyed by row position in the store
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+        for field, weight in SEARCH_FIELDS.items():
+            column = records.columns[field]
+            # Tokenise each distinct value once, not once per row
+            value_tokens = [set(tokenize(value)) for value in column.values]
+            for position, code in enumerate(column.codes):
+                for token in value_tokens[code]:
+                    postings = self._postings[token]
+                    postings[position] = postings.get(position, 0.0) + weight
+
+        self._vocabulary = sorted(self._postings)
+        for token in self._vocabulary:
+            for trigram in trigrams(token):
+                self._trigrams[trigram].add(token)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _idf(self, token: str) -> float:
+        return math.log(1 + len(self._store) / len(self._postings[token]))
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens matching ``term`` with a similarity in (0, 1]."""
+        matches: Dict[str, float] = {}
+        if term in self._postings:
+            matches[term] = 1.0
+
+        # Prefix matches support search-as-you-type
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            matches.setdefault(token, 0.9 * len(term) / len(token))
+
+        term_trigrams = trigrams(term)
+        shared: Dict[str, int] = defaultdict(int)
+        for trigram in term_trigrams:
+            for token in self._trigrams.get(trigram, ()):
+                shared[token] += 1
+        for token, count in shared.items():
+            similarity = count / (len(term_trigrams) + len(trigrams(token)) - count)
+            if similarity >= MIN_SIMILARITY:
+                matches[token] = max(matches.get(token, 0.0), similarity * 0.8)
+
+        return sorted(matches.items(), key=lambda item: item[1], reverse=True)[:MAX_EXPANSIONS]
+
+    def _score_term(self, expansions: List[Tuple[str, float]], candidates: Optional[Iterable[int]]) -> Dict[int, float]:
+        """Best score per row for one query term, restricted to ``candidates``."""
+        scores: Dict[int, float] = {}
+        for token, similarity in expansions:
+            postings = self._postings[token]
+            boost = similarity * self._idf(token)
+            if candidates is None:
+                matched = postings.items()
+            else:
+                matched = ((position, postings[position]) for position in candidates if position in postings)
+            for position, weight in matched:
+                score = boost * weight
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+        return scores
+
+    def search(self, query: str, limit: int = 20) -> Tuple[int, List[Tuple[Record, float]]]:
+        """Return ``(match_count, [(record, score), ...])`` best first."""
+        terms = [self._expand(term) for term in dict.fromkeys(tokenize(query))]
+        if not terms or not all(terms):
+            return 0, []
+        # Start from the most selective term so common words only probe survivors
+        terms.sort(key=lambda expansions: sum(len(self._postings[token]) for token, _ in expansions))
+
+        scores = self._score_term(terms[0], None)
+        for expansions in terms[1:]:
+            if not scores:
+                break
+            term_scores = self._score_term(expansions, scores)
+            scores = {position: score + term_scores[position] for position, score in scores.items() if position in term_scores}
+
+        if not scores:
+            return 0, []
+        ids = self._store.ids
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], ids[item[0]]))
+        return len(scores), [(self._store[position], round(score, 4)) for position, score in ranked]
+
+_index: Optional[RecordSearchIndex] = None
+_index_lock = threading.Lock()
+
+def get_search_index(version: Optional[int], load_records: Callable[[], Iterable[Record]]) -> RecordSearchIndex:
+    """Return the worker's index, rebuilding it once if ``version`` moved on."""
+    global _index
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = RecordSearchIndex(load_records(), version)
+        return _index
+
+def rebuild_search_index(records: Iterable[Record], version: Optional[int]) -> RecordSearchIndex:
+    global _index
+    index = RecordSearchIndex(records, version)
+    with _index_lock:
+        _index = index
+    return index
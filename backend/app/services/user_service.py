@@ -1,7 +1,15 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.auth import get_password_hash, verify_password
+from app.auth import (
+    get_password_hash,
+    get_password_hash_async,
+    invalidate_user_principals,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
 from typing import Optional
 
 class UserService:
@@ -33,11 +41,19 @@ class UserService:
         return self.db.query(User).filter(User.username == username).first()
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """Check credentials, upgrading the stored hash if its cost is out of date.
+
+        Raises ``HasherBusyError`` when the password hasher is saturated.
+        """
         user = self.get_user_by_username(username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            self.db.commit()
         return user
 
     def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
@@ -53,6 +69,7 @@ class UserService:
             setattr(db_user, field, value)
         
         self.db.commit()
+        invalidate_user_principals(user_id)
         self.db.refresh(db_user)
         return db_user
 
@@ -62,7 +79,101 @@ class UserService:
             return False
         self.db.delete(db_user)
         self.db.commit()
+        invalidate_user_principals(user_id)
         return True
 
     def get_users(self, skip: int = 0, limit: int = 100):
         return self.db.query(User).offset(skip).limit(limit).all()
+
+    def get_users_after(self, after_id: Optional[int] = None, limit: int = 100):
+        """Keyset page of users ordered by id, starting after ``after_id``."""
+        query = self.db.query(User)
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        return query.order_by(User.id).limit(limit).all()
+
+
+class AsyncUserService:
+    """``UserService`` over an ``AsyncSession``, for async routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_user(self, user: UserCreate) -> User:
+        hashed_password = await get_password_hash_async(user.password)
+        db_user = User(
+            email=user.email,
+            username=user.username,
+            hashed_password=hashed_password,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_active=user.is_active
+        )
+        self.db.add(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        return db_user
+
+    async def _first(self, *criteria) -> Optional[User]:
+        return (await self.db.execute(select(User).where(*criteria))).scalars().first()
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self._first(User.id == user_id)
+
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        return await self._first(User.email == email)
+
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        return await self._first(User.username == username)
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """Check credentials, upgrading the stored hash if its cost is out of date.
+
+        Raises ``HasherBusyError`` when the password hasher is saturated.
+        """
+        user = await self.get_user_by_username(username)
+        if not user:
+            return None
+        verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not verified:
+            return None
+        if new_hash is not None:
+            user.hashed_password = new_hash
+            await self.db.commit()
+        return user
+
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+        db_user = await self.get_user_by_id(user_id)
+        if not db_user:
+            return None
+
+        update_data = user_update.model_dump(exclude_unset=True)
+        if "password" in update_data:
+            update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
+
+        for field, value in update_data.items():
+            setattr(db_user, field, value)
+
+        await self.db.commit()
+        invalidate_user_principals(user_id)
+        await self.db.refresh(db_user)
+        return db_user
+
+    async def delete_user(self, user_id: int) -> bool:
+        db_user = await self.get_user_by_id(user_id)
+        if not db_user:
+            return False
+        await self.db.delete(db_user)
+        await self.db.commit()
+        invalidate_user_principals(user_id)
+        return True
+
+    async def get_users(self, skip: int = 0, limit: int = 100):
+        return (await self.db.execute(select(User).offset(skip).limit(limit))).scalars().all()
+
+    async def get_users_after(self, after_id: Optional[int] = None, limit: int = 100):
+        """Keyset page of users ordered by id, starting after ``after_id``."""
+        query = select(User)
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        return (await self.db.execute(query.order_by(User.id).limit(limit))).scalars().all()
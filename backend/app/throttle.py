@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses that mean "upstream is overloaded or failing, try again later"
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that has been failing."""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Rate limiter allowing ``rate`` calls per second with bursts of ``burst``.
+
+    A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, possibly on credit; returns the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+class AdaptiveLimiter:
+    """Concurrency limit tuned by additive-increase/multiplicative-decrease.
+
+    Each fast success raises the limit by ``1 / limit`` (about one slot per
+    round of calls). An error, or a latency above ``tolerance`` times the
+    fastest recently observed, multiplies it by ``backoff``. Decreases are
+    spaced at least one baseline latency apart so a single burst of slow
+    calls only counts once.
+    """
+
+    def __init__(self, initial: float, minimum: int = 1, maximum: int = 64, tolerance: float = 2.0, backoff: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(float(initial), self.minimum), self.maximum)
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    async def acquire(self) -> None:
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    # Woken but cancelled before taking the slot; pass it on
+                    self._wake()
+                raise
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def on_success(self, latency: float) -> None:
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            # Let the baseline drift up slowly if upstream gets slower for good
+            self.baseline += (latency - self.baseline) * 0.05
+        if latency > self.baseline * self.tolerance:
+            self.on_overload()
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_overload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < (self.baseline or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.backoff)
+
+class CircuitBreaker:
+    """Fail fast after ``failure_threshold`` consecutive failures.
+
+    After ``reset_timeout`` seconds a single probe call is let through; its
+    success closes the circuit again, its failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    def before_call(self) -> None:
+        if self.state == "open":
+            retry_in = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if retry_in > 0:
+                raise CircuitOpenError(f"Upstream circuit open; retrying in {retry_in:.0f}s", retry_in)
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            # A probe that never reported back (e.g. cancelled) is given up on
+            probe_age = time.monotonic() - self._probe_started
+            if self._probing and probe_age < self.reset_timeout:
+                raise CircuitOpenError("Upstream circuit half-open; probe in progress", self.reset_timeout - probe_age)
+            self._probing = True
+            self._probe_started = time.monotonic()
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Upstream circuit opened after %s failures", self.failures)
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUSES
+    return isinstance(exc, httpx.TransportError)
+
+def _retry_after(exc: BaseException) -> float:
+    if isinstance(exc, httpx.HTTPStatusError):
+        try:
+            return float(exc.response.headers.get("Retry-After", 0))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+class UpstreamGuard:
+    """Token bucket, adaptive concurrency, retries and a circuit breaker for one upstream.
+
+    Retries use decorrelated jitter: each delay is drawn between
+    ``retry_base`` and three times the previous delay, capped at
+    ``retry_max``, and never shorter than a ``Retry-After`` header. A
+    ``Retry-After`` beyond ``retry_max`` fails the call straight away
+    instead of sleeping, leaving the breaker to hold further calls off.
+    """
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        limiter: AdaptiveLimiter,
+        breaker: CircuitBreaker,
+        max_attempts: int = 4,
+        retry_base: float = 0.5,
+        retry_max: float = 20.0,
+    ):
+        self.bucket = bucket
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await ``call()``, retrying overload and transport failures."""
+        delay = self.retry_base
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.before_call()
+            await self.bucket.acquire()
+            await self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = await call()
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # Upstream answered; the problem is the request or its body
+                    self.breaker.record_success()
+                    raise
+                self.limiter.on_overload()
+                self.breaker.record_failure()
+                retry_after = _retry_after(exc)
+                if attempt == self.max_attempts or retry_after > self.retry_max:
+                    raise
+                delay = min(self.retry_max, random.uniform(self.retry_base, delay * 3))
+                wait = max(delay, retry_after)
+                logger.info("Upstream call failed (%s); retry %s in %.2fs", exc, attempt, wait)
+            else:
+                self.limiter.on_success(time.monotonic() - started)
+                self.breaker.record_success()
+                return result
+            finally:
+                self.limiter.release()
+            await asyncio.sleep(wait)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "circuit": self.breaker.state,
+        }
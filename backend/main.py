@@ -1,16 +1,46 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.controllers import users, reports, downloads
-from app.database import engine
+from app.compression import CompressionMiddleware
+from app.database import SessionLocal, dispose_engines, engine, pool_status
+from app.passwords import password_hasher
+from app.scheduler import sync_scheduler
 from app.models import Base
+from app.services.download_service import download_counter
+from app.services.planning_permissions_service import close_http_client
+from app.services.export_service import ExportService, shutdown_export_workers
+from app.services.report_service import ReportService, shutdown_report_workers
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up jobs queued before the last shutdown and drop unreferenced export files
+    db = SessionLocal()
+    try:
+        ReportService(db).resume_pending()
+        ExportService(db).resume_pending()
+        ExportService(db).collect_garbage()
+    finally:
+        db.close()
+    sync_scheduler.start()
+    download_counter.start()
+    yield
+    await sync_scheduler.stop()
+    await download_counter.stop()
+    await close_http_client()
+    shutdown_export_workers()
+    shutdown_report_workers()
+    password_hasher.shutdown()
+    await dispose_engines()
+
 app = FastAPI(
     title="FastAPI Clean Architecture",
     description="A FastAPI application following clean architecture principles",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -20,7 +50,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(CompressionMiddleware)
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
 app.include_router(downloads.router, prefix="/api/v1/downloads", tags=["downloads"])
@@ -33,6 +65,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def database_pool_status():
+    """Connection pool telemetry: checkout waits, in-use and idle connections"""
+    return {"pools": pool_status()}
+
 if __name__ == "__main__":
     import uvicorn
     import os
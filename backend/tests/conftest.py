@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+
+
+@pytest.fixture
+def session_factory(tmp_path_factory):
+    """Session factory over a file-backed SQLite database shared across threads."""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    """SQLite session with the application schema."""
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
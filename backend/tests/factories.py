@@ -0,0 +1,6 @@
+from app.models.planning_permission import Record
+
+
+def make_record(record_id, status="Issued", activity="Waste treatment", duty_holder="Acme Pty Ltd",
+                suburb="Melbourne", postcode="3000"):
+    return Record(record_id, "Development licence", status, activity, duty_holder, suburb, postcode)
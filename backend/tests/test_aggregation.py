@@ -0,0 +1,100 @@
+import pytest
+from app.models.record_store import RecordStore
+from app.services import aggregation
+from app.services.aggregation import RecordAggregates, get_aggregates, group_counts
+from tests.factories import make_record
+
+
+@pytest.fixture
+def store():
+    """A small register with repeated statuses and suburbs."""
+    return RecordStore([
+        make_record("1"),
+        make_record("2", status="Revoked"),
+        make_record("3", suburb="Geelong", postcode="3220"),
+        make_record("4", status="Revoked", suburb="Geelong", postcode="3220"),
+        make_record("5", suburb="Geelong", postcode="3220"),
+    ])
+
+
+class TestGroupCounts:
+    """Test suite for group_counts."""
+
+    def test_single_column(self, store):
+        """Test counts per value, largest group first."""
+        # Act
+        result = group_counts(store, ["status"])
+
+        # Assert
+        assert result == {
+            "total": 5,
+            "groups": [{"status": "Issued", "count": 3}, {"status": "Revoked", "count": 2}],
+        }
+
+    def test_cross_tab(self, store):
+        """Test counts per combination of several columns, ties ordered by value."""
+        # Act
+        result = group_counts(store, ["suburb", "status"])
+
+        # Assert
+        assert result["groups"] == [
+            {"suburb": "Geelong", "status": "Issued", "count": 2},
+            {"suburb": "Geelong", "status": "Revoked", "count": 1},
+            {"suburb": "Melbourne", "status": "Issued", "count": 1},
+            {"suburb": "Melbourne", "status": "Revoked", "count": 1},
+        ]
+
+    def test_unknown_column(self, store):
+        """Test that an unknown column raises KeyError."""
+        with pytest.raises(KeyError):
+            group_counts(store, ["missing"])
+
+
+class TestRecordAggregates:
+    """Test suite for RecordAggregates class."""
+
+    def test_materialises_results(self, store):
+        """Test that dimensions are precomputed and other group-bys are kept once computed."""
+        # Arrange
+        aggregates = RecordAggregates(store, version=1)
+
+        # Act
+        first = aggregates.get(["postcode", "status"])
+        again = aggregates.get(["postcode", "status"])
+
+        # Assert
+        assert ("suburb",) in aggregates._results
+        assert first is again
+        assert first["groups"][0] == {"postcode": "3220", "status": "Issued", "count": 2}
+
+    def test_dedupes_plain_records(self):
+        """Test that later duplicates of an id replace earlier ones."""
+        # Act
+        aggregates = RecordAggregates([make_record("1"), make_record("1", status="Revoked")])
+
+        # Assert
+        assert aggregates.get(["status"])["groups"] == [{"status": "Revoked", "count": 1}]
+
+
+class TestGetAggregates:
+    """Test suite for the per-worker aggregates holder."""
+
+    def test_rebuilds_only_when_version_changes(self, monkeypatch, store):
+        """Test that aggregates are reused until the register version moves on."""
+        # Arrange
+        monkeypatch.setattr(aggregation, "_aggregates", None)
+        loads = []
+
+        def load_records():
+            loads.append(1)
+            return store
+
+        # Act
+        first = get_aggregates(1, load_records)
+        again = get_aggregates(1, load_records)
+        newer = get_aggregates(2, load_records)
+
+        # Assert
+        assert first is again
+        assert newer is not first
+        assert len(loads) == 2
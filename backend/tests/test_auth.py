@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import auth
+from app.auth import create_access_token, get_current_user, invalidate_user_principals
+from app.cache import TTLCache
+from app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def principal_cache(monkeypatch):
+    """Give each test an empty principal cache."""
+    cache = TTLCache(ttl=60)
+    monkeypatch.setattr(auth, "principal_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def mock_db():
+    """Mock async session whose users query returns one user."""
+    db = Mock(spec=AsyncSession)
+    result = Mock()
+    result.scalars.return_value.first.return_value = User(
+        id=1, email="test@example.com", username="testuser", hashed_password="x", is_active=True, is_superuser=False
+    )
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+class TestGetCurrentUser:
+    """Test suite for get_current_user."""
+
+    def test_repeat_token_skips_database(self, mock_db):
+        """Test that a second request with the same token is served from the cache."""
+        # Arrange
+        token = create_access_token({"sub": "testuser"})
+
+        # Act
+        first = asyncio.run(get_current_user(token, mock_db))
+        second = asyncio.run(get_current_user(token, mock_db))
+
+        # Assert
+        assert mock_db.execute.await_count == 1
+        assert first is second
+        assert second.username == "testuser"
+
+    def test_invalidated_user_is_reloaded(self, mock_db):
+        """Test that invalidating a user forces the next request back to the database."""
+        # Arrange
+        token = create_access_token({"sub": "testuser"})
+        asyncio.run(get_current_user(token, mock_db))
+
+        # Act
+        invalidate_user_principals(1)
+        asyncio.run(get_current_user(token, mock_db))
+
+        # Assert
+        assert mock_db.execute.await_count == 2
+
+    def test_invalid_token_rejected(self, mock_db, principal_cache):
+        """Test that a bad token raises 401 and caches nothing."""
+        # Act
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(get_current_user("not-a-token", mock_db))
+
+        # Assert
+        assert excinfo.value.status_code == 401
+        assert len(principal_cache) == 0
+        mock_db.execute.assert_not_awaited()
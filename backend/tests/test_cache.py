@@ -0,0 +1,228 @@
+import asyncio
+import pytest
+from app.cache import AsyncTTLCache, EncodedBody, TTLCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class CountingLoader:
+    """Async loader that counts calls and can be held open."""
+
+    def __init__(self, value="value", delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"{self.value}-{self.calls}"
+
+
+class TestAsyncTTLCache:
+    """Test suite for AsyncTTLCache class."""
+
+    def test_concurrent_misses_share_one_load(self):
+        """Test that concurrent callers coalesce onto a single in-flight load."""
+        # Arrange
+        cache = AsyncTTLCache(ttl=60)
+        loader = CountingLoader(delay=0.01)
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(50)))
+
+        # Act
+        results = run(scenario())
+
+        # Assert
+        assert loader.calls == 1
+        assert set(results) == {"value-1"}
+
+    def test_fresh_entry_is_served_from_cache(self):
+        """Test that a fresh entry does not trigger a reload."""
+        # Arrange
+        cache = AsyncTTLCache(ttl=60)
+        loader = CountingLoader()
+
+        async def scenario():
+            await cache.get_or_load("key", loader)
+            return await cache.get_or_load("key", loader)
+
+        # Act
+        result = run(scenario())
+
+        # Assert
+        assert result == "value-1"
+        assert loader.calls == 1
+
+    def test_expired_entry_served_stale_while_refreshing(self):
+        """Test that an expired entry is returned while one background refresh runs."""
+        # Arrange
+        cache = AsyncTTLCache(ttl=0)
+        loader = CountingLoader()
+
+        async def scenario():
+            await cache.get_or_load("key", loader)
+            stale = await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(10)))
+            await asyncio.sleep(0.01)
+            return stale, cache._entries["key"].value
+
+        # Act
+        stale, refreshed = run(scenario())
+
+        # Assert
+        assert set(stale) == {"value-1"}
+        assert refreshed == "value-2"
+        assert loader.calls == 2
+
+    def test_entry_past_max_stale_blocks_on_reload(self):
+        """Test that entries older than max_stale are reloaded in the foreground."""
+        # Arrange
+        cache = AsyncTTLCache(ttl=0, max_stale=0)
+        loader = CountingLoader()
+
+        async def scenario():
+            await cache.get_or_load("key", loader)
+            return await cache.get_or_load("key", loader)
+
+        # Act
+        result = run(scenario())
+
+        # Assert
+        assert result == "value-2"
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the size cap evicts the least recently used key."""
+        # Arrange
+        cache = AsyncTTLCache(ttl=60, max_entries=2)
+        loader = CountingLoader()
+
+        async def scenario():
+            await cache.get_or_load("a", loader)
+            await cache.get_or_load("b", loader)
+            await cache.get_or_load("a", loader)
+            await cache.get_or_load("c", loader)
+
+        # Act
+        run(scenario())
+
+        # Assert
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_failed_load_is_not_cached(self):
+        """Test that a loader error propagates and the next call retries."""
+        # Arrange
+        cache = AsyncTTLCache(ttl=60)
+        calls = []
+
+        async def failing_loader():
+            calls.append(1)
+            raise RuntimeError("upstream down")
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await cache.get_or_load("key", failing_loader)
+            with pytest.raises(RuntimeError):
+                await cache.get_or_load("key", failing_loader)
+
+        # Act
+        run(scenario())
+
+        # Assert
+        assert len(calls) == 2
+        assert "key" not in cache
+
+
+class TestEncodedBody:
+    """Test suite for EncodedBody class."""
+
+    def test_etag_is_strong_and_content_derived(self):
+        """Test that equal bytes share an ETag and different bytes do not."""
+        # Act
+        first = EncodedBody.from_content(b'{"a":1}')
+        same = EncodedBody.from_content(b'{"a":1}')
+        other = EncodedBody.from_content(b'{"a":2}')
+
+        # Assert
+        assert first.etag == same.etag != other.etag
+        assert first.etag.startswith('"') and not first.etag.startswith("W/")
+
+    def test_matches_if_none_match(self):
+        """Test If-None-Match lists, weak prefixes and wildcards."""
+        # Arrange
+        body = EncodedBody.from_content(b"[]")
+
+        # Assert
+        assert body.matches(body.etag)
+        assert body.matches(f'"other", W/{body.etag}')
+        assert body.matches("*")
+        assert not body.matches('"other"')
+        assert not body.matches(None)
+
+
+class TestTTLCache:
+    """Test suite for TTLCache class."""
+
+    def test_entries_expire(self, monkeypatch):
+        """Test that entries are served until their TTL and a shorter per-entry TTL wins."""
+        # Arrange
+        now = [100.0]
+        monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+        cache = TTLCache(ttl=60)
+        cache.set("long", 1)
+        cache.set("short", 2, ttl=5)
+
+        # Act
+        now[0] += 10
+
+        # Assert
+        assert cache.get("long") == 1
+        assert cache.get("short") is None
+        assert len(cache) == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache keeps at most max_entries keys."""
+        # Arrange
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        # Act
+        cache.set("c", 3)
+
+        # Assert
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+    def test_invalidate_where(self):
+        """Test that entries are dropped by value."""
+        # Arrange
+        cache = TTLCache(ttl=60)
+        cache.set("t1", {"id": 1})
+        cache.set("t2", {"id": 1})
+        cache.set("t3", {"id": 2})
+
+        # Act
+        dropped = cache.invalidate_where(lambda value: value["id"] == 1)
+
+        # Assert
+        assert dropped == 2
+        assert cache.get("t3") == {"id": 2}
+
+    def test_set_after_invalidation_is_dropped(self):
+        """Test that a value loaded before an invalidation is not stored."""
+        # Arrange
+        cache = TTLCache(ttl=60)
+        generation = cache.generation
+
+        # Act
+        cache.invalidate("other")
+        cache.set("key", "stale", generation=generation)
+
+        # Assert
+        assert cache.get("key") is None
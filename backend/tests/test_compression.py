@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+import pytest
+from app import compression
+from app.compression import CompressionMiddleware, compress, negotiate
+
+
+def run_app(app, accept_encoding="gzip"):
+    """Call an ASGI app once and collect the response start and joined body."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = messages[0]
+    headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], headers, body, len(messages) - 1
+
+
+def make_app(chunks, content_type="application/json", extra_headers=()):
+    """ASGI app sending ``chunks`` as one or more body messages."""
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode()), *extra_headers]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+class TestNegotiate:
+    """Test suite for Accept-Encoding negotiation."""
+
+    @pytest.fixture(autouse=True)
+    def all_encodings(self, monkeypatch):
+        """Pretend brotli and zstd are both installed."""
+        monkeypatch.setattr(compression, "available_encodings", lambda: ["zstd", "br", "gzip"])
+
+    def test_prefers_server_order_on_ties(self):
+        """Test that equal weights fall back to the server's preference."""
+        assert negotiate("gzip, br, zstd") == "zstd"
+
+    def test_honours_quality_values(self):
+        """Test that q-values outrank server preference and q=0 excludes."""
+        assert negotiate("zstd;q=0.5, gzip") == "gzip"
+        assert negotiate("zstd;q=0, br;q=0.1") == "br"
+
+    def test_wildcard_and_absent(self):
+        """Test wildcard acceptance and headers that allow nothing."""
+        assert negotiate("*") == "zstd"
+        assert negotiate("identity") is None
+        assert negotiate(None) is None
+
+
+class TestCompressionMiddleware:
+    """Test suite for CompressionMiddleware class."""
+
+    def test_compresses_large_body(self):
+        """Test that a large JSON body is gzipped with updated headers."""
+        # Arrange
+        payload = b'{"records":[' + b'{"status":"Issued"},' * 200 + b"{}]}"
+        app = CompressionMiddleware(make_app([payload]), minimum_size=100)
+
+        # Act
+        status, headers, body, _ = run_app(app)
+
+        # Assert
+        assert headers["content-encoding"] == "gzip"
+        assert headers["vary"] == "Accept-Encoding"
+        assert int(headers["content-length"]) == len(body) < len(payload)
+        assert gzip.decompress(body) == payload
+
+    def test_streams_chunk_by_chunk(self):
+        """Test that streamed bodies stay streamed and decode to the original."""
+        # Arrange
+        chunks = [b'{"id":"%d"}\n' % i * 50 for i in range(3)]
+        app = CompressionMiddleware(make_app(chunks, "application/x-ndjson"), minimum_size=100)
+
+        # Act
+        _, headers, body, messages = run_app(app)
+
+        # Assert
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        assert messages == 3
+        assert gzip.decompress(body) == b"".join(chunks)
+
+    @pytest.mark.parametrize("app", [
+        make_app([b"x" * 10]),
+        make_app([b"x" * 500], content_type="application/vnd.apache.parquet"),
+        make_app([b"x" * 500], extra_headers=[(b"content-encoding", b"br")]),
+    ], ids=["small", "binary", "encoded"])
+    def test_passes_through(self, app):
+        """Test that small, binary and already-encoded bodies are untouched."""
+        # Act
+        _, headers, body, _ = run_app(CompressionMiddleware(app, minimum_size=100))
+
+        # Assert
+        assert headers.get("content-encoding") in (None, "br")
+        assert body.startswith(b"x")
+
+
+class TestCompress:
+    """Test suite for whole-body compression."""
+
+    def test_round_trips_every_available_encoding(self):
+        """Test that each available coding decompresses to the input."""
+        # Arrange
+        data = b'{"status":"Issued"}' * 100
+        decoders = {"gzip": gzip.decompress}
+        if compression.brotli is not None:
+            decoders["br"] = compression.brotli.decompress
+        if compression.zstandard is not None:
+            decoders["zstd"] = compression.zstandard.ZstdDecompressor().decompress
+
+        # Act / Assert
+        for encoding in compression.available_encodings():
+            assert decoders[encoding](compress(data, encoding)) == data
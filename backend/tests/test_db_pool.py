@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.database import async_database_url, engine_options
+from app.db_pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument
+
+
+@pytest.fixture
+def pooled_engine(tmp_path):
+    """A one-connection instrumented pool over a SQLite file."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestPoolMetrics:
+    """Test suite for pool telemetry."""
+
+    def test_counts_in_use_and_timeouts(self, pooled_engine):
+        """Test that checkouts, in-use connections and timed-out waits are recorded."""
+        # Arrange
+        metrics = instrument(pooled_engine)
+
+        # Act
+        with pooled_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            during = metrics.snapshot(pooled_engine.pool)
+            with pytest.raises(PoolTimeoutError):
+                pooled_engine.connect()
+        after = metrics.snapshot(pooled_engine.pool)
+
+        # Assert
+        assert during["in_use"] == 1
+        assert during["size"] == 1
+        assert after["in_use"] == 0
+        assert after["peak_in_use"] == 1
+        assert after["checkouts"] == 1
+        assert after["timeouts"] == 1
+        assert after["wait_seconds_max"] >= 0.05
+        assert after["idle"] == 1
+
+    def test_metrics_survive_dispose(self, pooled_engine):
+        """Test that the replacement pool after dispose keeps reporting."""
+        # Arrange
+        metrics = instrument(pooled_engine)
+
+        # Act
+        pooled_engine.dispose()
+        with pooled_engine.connect():
+            pass
+
+        # Assert
+        assert pooled_engine.pool.metrics is metrics
+        assert metrics.snapshot()["checkouts"] == 1
+        assert metrics.snapshot()["wait_seconds_p50"] is not None
+
+
+class TestEngineOptions:
+    """Test suite for engine configuration helpers."""
+
+    def test_server_databases_get_timed_pools(self, monkeypatch):
+        """Test that pool sizing applies to server databases only."""
+        # Arrange
+        monkeypatch.setattr("app.database.DB_POOL_SIZE", 20)
+
+        # Act
+        sync_options = engine_options("postgresql://u@h/d")
+        async_options = engine_options("postgresql+asyncpg://u@h/d", asynchronous=True)
+        sqlite_options = engine_options("sqlite:///app.db")
+
+        # Assert
+        assert sync_options["poolclass"] is TimedQueuePool
+        assert sync_options["pool_size"] == 20
+        assert async_options["poolclass"] is TimedAsyncAdaptedQueuePool
+        assert "pool_size" not in sqlite_options
+        assert sqlite_options["pool_pre_ping"] is True
+
+    def test_async_database_url(self):
+        """Test that sync URLs map to their asyncio drivers."""
+        assert async_database_url("postgresql://u:p@h:5432/d") == "postgresql+asyncpg://u:p@h:5432/d"
+        assert async_database_url("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
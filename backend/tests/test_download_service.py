@@ -0,0 +1,80 @@
+import pytest
+from app.models.download import Download
+from app.models.user import User
+from app.services.download_service import DownloadCounter
+
+
+@pytest.fixture
+def download_ids(session_factory):
+    """Two ready downloads owned by one user."""
+    db = session_factory()
+    db.add(User(id=1, email="test@example.com", username="testuser", hashed_password="x"))
+    downloads = [Download(filename=name, file_path=name, user_id=1, download_count=0) for name in ("a.csv", "b.csv")]
+    db.add_all(downloads)
+    db.commit()
+    ids = [download.id for download in downloads]
+    db.close()
+    return ids
+
+
+def download_counts(session_factory):
+    db = session_factory()
+    try:
+        return {download.id: download.download_count for download in db.query(Download).all()}
+    finally:
+        db.close()
+
+
+class TestDownloadCounter:
+    """Test suite for DownloadCounter class."""
+
+    def test_increments_wait_for_flush(self, session_factory, download_ids):
+        """Test that increments are only written, batched, on flush."""
+        # Arrange
+        counter = DownloadCounter(interval=60, session_factory=session_factory)
+        first, second = download_ids
+
+        # Act
+        for _ in range(3):
+            counter.increment(first)
+        counter.increment(second)
+        before = download_counts(session_factory)
+        flushed = counter.flush()
+
+        # Assert
+        assert before == {first: 0, second: 0}
+        assert flushed == 2
+        assert download_counts(session_factory) == {first: 3, second: 1}
+        assert counter.pending(first) == 0
+        assert counter.flush() == 0
+
+    def test_failed_flush_keeps_counts(self, session_factory, download_ids):
+        """Test that tallies survive a failed flush and are written by the next one."""
+        # Arrange
+        counter = DownloadCounter(interval=60, session_factory=session_factory)
+        counter.increment(download_ids[0], 2)
+
+        def broken_session():
+            raise RuntimeError("database down")
+
+        counter.session_factory = broken_session
+
+        # Act
+        with pytest.raises(RuntimeError):
+            counter.flush()
+        counter.session_factory = session_factory
+        counter.flush()
+
+        # Assert
+        assert download_counts(session_factory)[download_ids[0]] == 2
+
+    def test_zero_interval_writes_through(self, session_factory, download_ids):
+        """Test that an interval of 0 writes each increment straight away."""
+        # Arrange
+        counter = DownloadCounter(interval=0, session_factory=session_factory)
+
+        # Act
+        counter.increment(download_ids[1])
+
+        # Assert
+        assert download_counts(session_factory)[download_ids[1]] == 1
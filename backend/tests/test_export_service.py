@@ -0,0 +1,287 @@
+import csv
+import os
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.download import Download, ExportBlob
+from app.models.user import User
+from app.schemas.download import DownloadCreate, ExportCreate
+from app.services.download_service import DownloadService
+from app.schemas.report import PermissionFilter
+from app.services import export_service
+from app.services.export_service import ExportService, run_export, write_export
+from app.services.permission_record_service import PermissionRecordService
+from tests.factories import make_record
+
+
+@pytest.fixture(autouse=True)
+def export_dir(monkeypatch, tmp_path):
+    """Keep stored export files under the test's directory."""
+    monkeypatch.setattr(export_service, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(ExportService, "submit", lambda self, download_id, export: None)
+    return tmp_path
+
+
+@pytest.fixture
+def pending_download(session_factory, tmp_path):
+    """A user, a stored register and a pending export download."""
+    db = session_factory()
+    db.add(User(id=1, email="test@example.com", username="testuser", hashed_password="x"))
+    PermissionRecordService(db).sync([make_record("1"), make_record("2", status="Revoked"), make_record("3")])
+    download = Download(filename="export.csv", file_path=str(tmp_path / "export.csv"), user_id=1, status="pending")
+    db.add(download)
+    db.commit()
+    download_id = download.id
+    db.close()
+    return download_id
+
+
+class TestWriteExport:
+    """Test suite for export file writers."""
+
+    @pytest.fixture(autouse=True)
+    def small_batches(self, monkeypatch):
+        """Force several chunks per export."""
+        monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 2)
+
+    def test_csv(self, tmp_path):
+        """Test that CSV exports have a header and one row per record."""
+        # Arrange
+        path = tmp_path / "out.csv"
+
+        # Act
+        write_export([make_record(str(i)) for i in range(5)], "csv", str(path))
+
+        # Assert
+        with open(path, newline="") as output:
+            rows = list(csv.reader(output))
+        assert rows[0] == ["id", "permissionType", "status", "activity", "dutyHolder", "suburb", "postcode"]
+        assert [row[0] for row in rows[1:]] == ["0", "1", "2", "3", "4"]
+
+    def test_parquet(self, tmp_path):
+        """Test that Parquet exports round-trip."""
+        # Arrange
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "out.parquet"
+
+        # Act
+        write_export([make_record(str(i)) for i in range(5)], "parquet", str(path))
+
+        # Assert
+        table = pq.read_table(path)
+        assert table.num_rows == 5
+        assert table.column("id").to_pylist() == ["0", "1", "2", "3", "4"]
+
+    def test_arrow(self, tmp_path):
+        """Test that Arrow IPC exports round-trip."""
+        # Arrange
+        pa = pytest.importorskip("pyarrow")
+        path = tmp_path / "out.arrow"
+
+        # Act
+        write_export([make_record(str(i)) for i in range(5)], "arrow", str(path))
+
+        # Assert
+        table = pa.ipc.open_file(str(path)).read_all()
+        assert table.num_rows == 5
+        assert table.column("status").to_pylist() == ["Issued"] * 5
+
+    def test_unknown_format(self, tmp_path):
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError):
+            write_export([], "xlsx", str(tmp_path / "out.xlsx"))
+
+
+class TestRunExport:
+    """Test suite for the background export job."""
+
+    def test_marks_download_ready(self, session_factory, pending_download, tmp_path):
+        """Test that a finished export records its size and becomes ready."""
+        # Act
+        run_export(pending_download, ExportCreate(format="csv", filters=PermissionFilter(status="Issued")), session_factory)
+
+        # Assert
+        db = session_factory()
+        download = db.get(Download, pending_download)
+        assert download.status == "ready"
+        assert download.file_path.startswith(str(tmp_path / "blobs"))
+        with open(download.file_path) as output:
+            assert len(output.read().splitlines()) == 3
+        assert download.file_size == os.path.getsize(download.file_path)
+        assert download.export_key is not None
+        assert not (tmp_path / "export.csv.part").exists()
+
+    def test_marks_download_failed(self, session_factory, pending_download, tmp_path):
+        """Test that a failing export is recorded and leaves no partial file."""
+        # Act
+        run_export(pending_download, ExportCreate(format="csv", sort="activity"), session_factory)
+
+        # Assert
+        db = session_factory()
+        download = db.get(Download, pending_download)
+        assert download.status == "failed"
+        assert "activity" in download.error
+        assert list(tmp_path.iterdir()) == []
+
+    def test_runs_once(self, session_factory, pending_download):
+        """Test that an export queued twice is generated once and holds one blob reference."""
+        # Arrange
+        run_export(pending_download, ExportCreate(), session_factory)
+
+        # Act
+        run_export(pending_download, ExportCreate(), session_factory)
+
+        # Assert
+        db = session_factory()
+        download = db.get(Download, pending_download)
+        assert download.status == "ready"
+        assert db.get(ExportBlob, download.blob_id).ref_count == 1
+
+
+class TestResumePending:
+    """Test suite for re-queueing exports after a restart."""
+
+    def test_resubmits_with_stored_parameters(self, session_factory, pending_download, monkeypatch):
+        """Test that a pending export is resubmitted with its request and an unknown one is failed."""
+        # Arrange
+        submitted = []
+        monkeypatch.setattr(ExportService, "submit", lambda self, download_id, export: submitted.append((download_id, export)))
+        db = session_factory()
+        export = ExportCreate(format="csv", filters=PermissionFilter(
+            status="Issued", permissionType="Development licence", dutyHolder="Acme Pty Ltd"
+        ))
+        queued = ExportService(db).request_export(export, user_id=1)
+        submitted.clear()
+
+        # Act
+        resumed = ExportService(db).resume_pending()
+
+        # Assert
+        assert resumed == 1
+        assert submitted == [(queued.id, export)]
+        assert submitted[0][1].filters.duty_holder == "Acme Pty Ltd"
+        db.expire_all()
+        legacy = db.get(Download, pending_download)
+        assert legacy.status == "failed"
+        assert legacy.error == "Interrupted by a restart"
+
+    def test_resumes_orphaned_running(self, session_factory, monkeypatch):
+        """Test that exports stuck running past the stale limit are re-queued, live ones are not."""
+        # Arrange
+        submitted = []
+        monkeypatch.setattr(ExportService, "submit", lambda self, download_id, export: submitted.append(download_id))
+        db = session_factory()
+        db.add(User(id=1, email="test@example.com", username="testuser", hashed_password="x"))
+        orphaned = ExportService(db).request_export(ExportCreate(), user_id=1)
+        live = ExportService(db).request_export(ExportCreate(format="csv", sort="suburb"), user_id=1)
+        orphaned.status = live.status = "running"
+        orphaned.started_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        live.started_at = datetime.now(timezone.utc)
+        db.commit()
+        orphaned_id, live_id = orphaned.id, live.id
+        submitted.clear()
+
+        # Act
+        resumed = ExportService(db).resume_pending(stale_after=3600)
+
+        # Assert
+        assert resumed == 1
+        assert submitted == [orphaned_id]
+        db.expire_all()
+        assert db.get(Download, orphaned_id).status == "pending"
+        assert db.get(Download, live_id).status == "running"
+
+
+class TestExportDeduplication:
+    """Test suite for content-addressed export storage."""
+
+    def run_pending(self, db, session_factory, download):
+        run_export(download.id, ExportCreate(), session_factory)
+        db.expire_all()
+        return db.get(Download, download.id)
+
+    def test_repeat_export_shares_file(self, session_factory, pending_download):
+        """Test that repeating a finished export links its file instead of regenerating it."""
+        # Arrange
+        run_export(pending_download, ExportCreate(), session_factory)
+        db = session_factory()
+        first = db.get(Download, pending_download)
+
+        # Act
+        repeat = ExportService(db).request_export(ExportCreate(), user_id=1)
+
+        # Assert
+        assert repeat.status == "ready"
+        assert repeat.file_path == first.file_path
+        assert repeat.blob_id == first.blob_id
+        assert db.get(ExportBlob, first.blob_id).ref_count == 2
+
+    def test_identical_content_stored_once(self, session_factory, pending_download):
+        """Test that exports of different versions with the same content share a blob."""
+        # Arrange
+        run_export(pending_download, ExportCreate(), session_factory)
+        db = session_factory()
+        first = db.get(Download, pending_download)
+        first.export_key = "older-version"
+        db.commit()
+        second = ExportService(db).request_export(ExportCreate(), user_id=1)
+
+        # Act
+        second = self.run_pending(db, session_factory, second)
+
+        # Assert
+        assert second.blob_id == first.blob_id
+        assert db.query(ExportBlob).count() == 1
+        assert len(os.listdir(os.path.dirname(first.file_path))) == 1
+
+    def test_last_delete_removes_file(self, session_factory, pending_download):
+        """Test that a shared file survives until its last download is deleted."""
+        # Arrange
+        run_export(pending_download, ExportCreate(), session_factory)
+        db = session_factory()
+        service = ExportService(db)
+        repeat = service.request_export(ExportCreate(), user_id=1)
+        path = repeat.file_path
+
+        # Act
+        service.delete_download(pending_download, user_id=1)
+        after_first = os.path.exists(path)
+        service.delete_download(repeat.id, user_id=1)
+
+        # Assert
+        assert after_first
+        assert not os.path.exists(path)
+        assert db.query(ExportBlob).count() == 0
+
+    def test_client_download_never_removes_files(self, session_factory, pending_download):
+        """Test that deleting a download created through the API leaves shared files alone."""
+        # Arrange
+        run_export(pending_download, ExportCreate(), session_factory)
+        db = session_factory()
+        path = db.get(Download, pending_download).file_path
+        client_download = DownloadService(db).create_download(
+            DownloadCreate(filename="copy.csv", file_path=path), user_id=1
+        )
+
+        # Act
+        ExportService(db).delete_download(client_download.id, user_id=1)
+
+        # Assert
+        assert client_download.file_path is None
+        assert os.path.exists(path)
+        assert db.get(ExportBlob, db.get(Download, pending_download).blob_id).ref_count == 1
+
+    def test_collect_garbage_recounts_references(self, session_factory, pending_download):
+        """Test that blobs orphaned by bulk deletes are found and removed."""
+        # Arrange
+        run_export(pending_download, ExportCreate(), session_factory)
+        db = session_factory()
+        path = db.get(Download, pending_download).file_path
+        db.query(Download).delete()
+        db.commit()
+
+        # Act
+        deleted = ExportService(db).collect_garbage()
+
+        # Assert
+        assert deleted == 1
+        assert not os.path.exists(path)
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import pytest
+from passlib.context import CryptContext
+from app.passwords import HasherBusyError, PasswordHasher
+
+
+@pytest.fixture
+def context():
+    """A fast context standing in for bcrypt."""
+    return CryptContext(schemes=["sha256_crypt"], sha256_crypt__default_rounds=1000)
+
+
+class BlockingContext:
+    """Context whose hash call waits until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return password
+
+
+class TestPasswordHasher:
+    """Test suite for PasswordHasher class."""
+
+    def test_hash_and_verify(self, context):
+        """Test that hashes made on the pool verify, sync and async."""
+        # Arrange
+        hasher = PasswordHasher(context, workers=2, max_queue=2)
+
+        # Act
+        hashed = hasher.hash("secret")
+        verified = asyncio.run(hasher.verify_and_update_async("secret", hashed))
+        rejected = hasher.verify_and_update("wrong", hashed)
+        hasher.shutdown()
+
+        # Assert
+        assert verified == (True, None)
+        assert rejected == (False, None)
+        assert hasher.in_flight == 0
+
+    def test_outdated_cost_is_rehashed(self, context):
+        """Test that verifying against a stronger policy returns an upgraded hash."""
+        # Arrange
+        hashed = context.hash("secret")
+        stronger = CryptContext(
+            schemes=["sha256_crypt"], sha256_crypt__default_rounds=2000, sha256_crypt__min_rounds=2000
+        )
+        hasher = PasswordHasher(stronger, workers=1, max_queue=0)
+
+        # Act
+        verified, new_hash = hasher.verify_and_update("secret", hashed)
+        hasher.shutdown()
+
+        # Assert
+        assert verified
+        assert new_hash is not None and "rounds=2000" in new_hash
+
+    def test_rejects_when_saturated(self):
+        """Test that calls beyond the workers and queue fail fast."""
+        # Arrange
+        context = BlockingContext()
+        hasher = PasswordHasher(context, workers=1, max_queue=1)
+        pending = [hasher._submit(context.hash, "a"), hasher._submit(context.hash, "b")]
+
+        # Act
+        with pytest.raises(HasherBusyError):
+            hasher.hash("c")
+        context.release.set()
+        results = [future.result() for future in pending]
+        hasher.shutdown()
+
+        # Assert
+        assert results == ["a", "b"]
+        assert hasher.in_flight == 0
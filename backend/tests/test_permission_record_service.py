@@ -0,0 +1,257 @@
+import pytest
+from app.models.planning_permission import PermissionRecord
+from app.schemas.report import PermissionFilter
+from app.services.permission_record_service import PermissionRecordService
+from tests.factories import make_record
+
+
+@pytest.fixture
+def record_service(db):
+    """PermissionRecordService instance backed by SQLite."""
+    return PermissionRecordService(db)
+
+
+class TestPermissionRecordService:
+    """Test suite for PermissionRecordService class."""
+
+    def test_ingest_inserts_records(self, record_service, db):
+        """Test that a scrape is written in batches."""
+        # Act
+        written = record_service.ingest([make_record(str(i)) for i in range(5)], batch_size=2)
+
+        # Assert
+        assert written == 5
+        assert db.query(PermissionRecord).count() == 5
+
+    def test_ingest_updates_existing_records(self, record_service, db):
+        """Test that re-ingesting a record updates it in place."""
+        # Arrange
+        record_service.ingest([make_record("1", status="Issued")])
+
+        # Act
+        record_service.ingest([make_record("1", status="Revoked")])
+
+        # Assert
+        assert db.query(PermissionRecord).count() == 1
+        assert db.query(PermissionRecord).one().status == "Revoked"
+
+    def test_ingest_deduplicates_within_batch(self, record_service, db):
+        """Test that a record repeated across upstream pages is stored once."""
+        # Act
+        written = record_service.ingest([make_record("1"), make_record("1", suburb="Geelong")])
+
+        # Assert
+        assert written == 1
+        assert db.query(PermissionRecord).one().suburb == "Geelong"
+
+    def test_get_planning_permissions(self, record_service):
+        """Test that stored rows are returned as PlanningPermissions."""
+        # Arrange
+        record_service.ingest([make_record("2"), make_record("1")])
+
+        # Act
+        result = record_service.get_planning_permissions()
+
+        # Assert
+        assert result.total == 2
+        assert result.permissions == [make_record("1"), make_record("2")]
+
+    def test_sync_inserts_new_records(self, record_service):
+        """Test that the first sync inserts every record."""
+        # Act
+        register_sync = record_service.sync([make_record("1"), make_record("2")])
+
+        # Assert
+        assert (register_sync.inserted, register_sync.updated, register_sync.deleted) == (2, 0, 0)
+        assert record_service.count() == 2
+
+    def test_sync_writes_only_changed_records(self, record_service, db):
+        """Test that unchanged fingerprints are skipped on re-sync."""
+        # Arrange
+        first = record_service.sync([make_record("1"), make_record("2")])
+
+        # Act
+        second = record_service.sync([make_record("1"), make_record("2", status="Revoked")])
+
+        # Assert
+        assert (second.inserted, second.updated, second.deleted) == (0, 1, 0)
+        assert db.get(PermissionRecord, "1").change_seq == first.id
+        assert db.get(PermissionRecord, "2").change_seq == second.id
+
+    def test_sync_tombstones_missing_records(self, record_service, db):
+        """Test that records dropped upstream are tombstoned, not deleted."""
+        # Arrange
+        record_service.sync([make_record("1"), make_record("2")])
+
+        # Act
+        register_sync = record_service.sync([make_record("1")])
+
+        # Assert
+        assert register_sync.deleted == 1
+        assert record_service.count() == 1
+        assert db.get(PermissionRecord, "2").deleted_at is not None
+
+    def test_sync_restores_tombstoned_record(self, record_service):
+        """Test that a record reappearing upstream is live again."""
+        # Arrange
+        record_service.sync([make_record("1")])
+        record_service.sync([])
+
+        # Act
+        register_sync = record_service.sync([make_record("1")])
+
+        # Assert
+        assert register_sync.inserted == 1
+        assert record_service.count() == 1
+
+    def test_get_changes_since_cursor(self, record_service):
+        """Test that the change feed returns only deltas after the cursor."""
+        # Arrange
+        first = record_service.sync([make_record("1"), make_record("2")])
+        second = record_service.sync([make_record("1", status="Revoked")])
+
+        # Act
+        result = record_service.get_changes(since=first.id)
+
+        # Assert
+        assert result.cursor == second.id
+        assert result.upserted == [make_record("1", status="Revoked")]
+        assert result.deleted == ["2"]
+
+    def test_get_changes_pages(self, record_service):
+        """Test that a bounded change feed pages by (change_seq, id) without skipping rows."""
+        # Arrange
+        first = record_service.sync([make_record("1")])
+        second = record_service.sync([make_record("1", status="Revoked"), make_record("2"), make_record("3")])
+
+        # Act
+        page_one = record_service.get_changes(since=first.id, limit=2)
+        page_two = record_service.get_changes(since=first.id, limit=2, cursor=page_one.nextCursor)
+
+        # Assert
+        assert [record.id for record in page_one.upserted] == ["1", "2"]
+        assert page_one.cursor == first.id
+        assert [record.id for record in page_two.upserted] == ["3"]
+        assert page_two.nextCursor is None
+        assert page_two.cursor == second.id
+
+    def test_get_changes_invalid_cursor(self, record_service):
+        """Test that a malformed change feed cursor is rejected."""
+        # Act / Assert
+        with pytest.raises(ValueError):
+            record_service.get_changes(cursor="not-a-cursor")
+
+    def test_get_changes_no_changes(self, record_service):
+        """Test that an up-to-date cursor is returned unchanged."""
+        # Arrange
+        register_sync = record_service.sync([make_record("1")])
+
+        # Act
+        result = record_service.get_changes(since=register_sync.id)
+
+        # Assert
+        assert result.cursor == register_sync.id
+        assert result.upserted == []
+        assert result.deleted == []
+
+    def test_get_planning_permissions_pages(self, record_service):
+        """Test that skip/limit return one page and the full match count."""
+        # Arrange
+        record_service.ingest([make_record(str(i)) for i in range(5)])
+
+        # Act
+        result = record_service.get_planning_permissions(skip=2, limit=2)
+
+        # Assert
+        assert result.total == 5
+        assert [record.id for record in result.permissions] == ["2", "3"]
+        assert (result.page, result.pageSize) == (2, 2)
+
+    def test_get_planning_permissions_filters(self, record_service):
+        """Test that filters are applied server-side before paging."""
+        # Arrange
+        record_service.ingest([
+            make_record("1", status="Issued", suburb="Geelong"),
+            make_record("2", status="Revoked", suburb="Geelong"),
+            make_record("3", status="Issued", suburb="Melbourne"),
+        ])
+        filters = PermissionFilter(status="Issued", suburb="Geelong")
+
+        # Act
+        result = record_service.get_planning_permissions(filters=filters)
+
+        # Assert
+        assert result.total == 1
+        assert [record.id for record in result.permissions] == ["1"]
+
+    def test_get_planning_permissions_filters_by_alias(self, record_service):
+        """Test that camelCase filter names map to the stored columns."""
+        # Arrange
+        record_service.ingest([make_record("1")])
+
+        # Act
+        matching = record_service.get_planning_permissions(filters=PermissionFilter(dutyHolder="Acme Pty Ltd"))
+        missing = record_service.get_planning_permissions(filters=PermissionFilter(permissionType="Permit"))
+
+        # Assert
+        assert matching.total == 1
+        assert missing.total == 0
+
+    def test_keyset_pages_cover_every_record_once(self, record_service):
+        """Test that following nextCursor walks the register without gaps or repeats."""
+        # Arrange
+        record_service.ingest([make_record(str(i), suburb=["Geelong", "Ballarat"][i % 2]) for i in range(7)])
+
+        # Act
+        seen = []
+        page = record_service.get_planning_permissions(limit=3, sort="suburb")
+        seen += page.permissions
+        while page.nextCursor:
+            page = record_service.get_planning_permissions(limit=3, sort="suburb", cursor=page.nextCursor)
+            assert page.page is None
+            seen += page.permissions
+
+        # Assert
+        assert [(record.suburb, record.id) for record in seen] == sorted((record.suburb, record.id) for record in seen)
+        assert len({record.id for record in seen}) == 7
+
+    def test_keyset_last_page_has_no_cursor(self, record_service):
+        """Test that the final page does not offer a next cursor."""
+        # Arrange
+        record_service.ingest([make_record(str(i)) for i in range(2)])
+
+        # Act
+        result = record_service.get_planning_permissions(limit=2)
+
+        # Assert
+        assert result.nextCursor is None
+
+    def test_keyset_rejects_cursor_for_other_sort(self, record_service):
+        """Test that a cursor cannot be replayed against a different sort."""
+        # Arrange
+        record_service.ingest([make_record(str(i)) for i in range(3)])
+        cursor = record_service.get_planning_permissions(limit=1, sort="status").nextCursor
+
+        # Act / Assert
+        with pytest.raises(ValueError):
+            record_service.get_planning_permissions(limit=1, sort="suburb", cursor=cursor)
+
+    def test_unknown_sort_key(self, record_service):
+        """Test that unknown sort keys are rejected."""
+        with pytest.raises(ValueError):
+            record_service.get_planning_permissions(sort="activity")
+
+    def test_iter_records_streams_matches_in_order(self, record_service):
+        """Test that streaming yields every matching record in sort order."""
+        # Arrange
+        record_service.ingest([
+            make_record("1", suburb="Torquay"),
+            make_record("2", suburb="Geelong", status="Revoked"),
+            make_record("3", suburb="Ballarat"),
+        ])
+
+        # Act
+        result = list(record_service.iter_records(PermissionFilter(status="Issued"), sort="suburb"))
+
+        # Assert
+        assert [record.id for record in result] == ["3", "1"]
@@ -0,0 +1,315 @@
+import asyncio
+import httpx
+import ijson
+import pytest
+from app.cache import DiskResponseCache
+from app.services.planning_permissions_service import PlanningPermissionsService
+from app.throttle import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, TokenBucket, UpstreamGuard
+
+
+def make_record(record_id):
+    return {
+        "id": record_id,
+        "permissionType": "Development licence",
+        "status": "Issued",
+        "activity": "Waste treatment",
+        "dutyHolder": "Acme Pty Ltd",
+        "suburb": "Melbourne",
+        "postcode": "3000",
+    }
+
+
+def make_register(total, page_size):
+    """Build a fake upstream handler serving `total` records in pages of `page_size`."""
+    requested_pages = []
+
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested_pages.append(page)
+        start = (page - 1) * page_size
+        records = [make_record(i) for i in range(start, min(start + page_size, total))]
+        return httpx.Response(200, json={
+            "total": total,
+            "records": records,
+            "page": page,
+            "pageSize": page_size,
+        })
+
+    return handler, requested_pages
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_guard(max_attempts=4, breaker_threshold=5):
+    """An upstream guard with no rate limit and no retry delay."""
+    return UpstreamGuard(
+        bucket=TokenBucket(0),
+        limiter=AdaptiveLimiter(4),
+        breaker=CircuitBreaker(breaker_threshold, reset_timeout=60),
+        max_attempts=max_attempts,
+        retry_base=0,
+    )
+
+
+class TestPlanningPermissionsService:
+    """Test suite for PlanningPermissionsService class."""
+
+    def test_crawl_fetches_every_page(self):
+        """Test that the crawler follows total/pageSize past the first page."""
+        # Arrange
+        handler, requested_pages = make_register(total=25, page_size=10)
+
+        async def crawl():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await PlanningPermissionsService(client, permission_types=["Development licence"], page_size=10, max_concurrency=2).crawl()
+
+        # Act
+        result = run(crawl())
+
+        # Assert
+        assert sorted(requested_pages) == [1, 2, 3]
+        assert result.total == 25
+        assert [record.id for record in result.permissions] == [str(i) for i in range(25)]
+
+    def test_crawl_single_page(self):
+        """Test that a register that fits in one page is fetched once."""
+        # Arrange
+        handler, requested_pages = make_register(total=3, page_size=10)
+
+        async def crawl():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await PlanningPermissionsService(client, permission_types=["Development licence"], page_size=10).crawl()
+
+        # Act
+        result = run(crawl())
+
+        # Assert
+        assert requested_pages == [1]
+        assert len(result.permissions) == 3
+
+    def test_crawl_merges_permission_types(self):
+        """Test that every permission type is crawled and merged without duplicate ids."""
+        # Arrange
+        requested = []
+        totals = {"Development licence": 12, "Operating licence": 3}
+
+        def handler(request):
+            permission_type = request.url.params["permissionType"]
+            page = int(request.url.params["page"])
+            requested.append((permission_type, page))
+            offset = 0 if permission_type == "Development licence" else 11
+            start = (page - 1) * 10
+            records = [
+                make_record(offset + i) | {"permissionType": permission_type}
+                for i in range(start, min(start + 10, totals[permission_type]))
+            ]
+            return httpx.Response(200, json={
+                "total": totals[permission_type],
+                "records": records,
+                "page": page,
+                "pageSize": 10,
+            })
+
+        async def crawl():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                service = PlanningPermissionsService(client, permission_types=list(totals), page_size=10, guard=make_guard())
+                return await service.crawl()
+
+        # Act
+        result = run(crawl())
+
+        # Assert
+        assert sorted(requested) == [("Development licence", 1), ("Development licence", 2), ("Operating licence", 1)]
+        assert result.total == 14
+        assert [record.id for record in result.permissions] == [str(i) for i in range(14)]
+        assert result.records[11].permissionType == "Development licence"
+        assert result.records[13].permissionType == "Operating licence"
+
+    def test_crawl_raises_on_upstream_error(self):
+        """Test that upstream HTTP errors are surfaced once retries are exhausted."""
+        # Arrange
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        async def crawl():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await PlanningPermissionsService(client, permission_types=["Development licence"], guard=make_guard(max_attempts=3)).crawl()
+
+        # Act / Assert
+        with pytest.raises(httpx.HTTPStatusError):
+            run(crawl())
+        assert len(calls) == 3
+
+    def test_fetch_page_retries_transient_errors(self, tmp_path):
+        """Test that a 503 followed by a success returns the page."""
+        # Arrange
+        handler, _ = make_register(total=2, page_size=10)
+        responses = iter([httpx.Response(503), httpx.Response(429, headers={"Retry-After": "0"})])
+
+        def flaky(request):
+            return next(responses, None) or handler(request)
+
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(flaky)) as client:
+                service = PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path)), guard=make_guard())
+                return await service.fetch_page(1)
+
+        # Act
+        meta, records = run(fetch())
+
+        # Assert
+        assert meta["total"] == 2
+        assert len(records) == 2
+
+    def test_long_retry_after_fails_fast(self, tmp_path):
+        """Test that a Retry-After beyond the retry cap is not slept through."""
+        # Arrange
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, headers={"Retry-After": "3600"})
+
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                service = PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path)), guard=make_guard())
+                return await service.fetch_page(1)
+
+        # Act / Assert
+        with pytest.raises(httpx.HTTPStatusError):
+            run(fetch())
+        assert len(calls) == 1
+
+    def test_open_circuit_fails_fast(self, tmp_path):
+        """Test that repeated failures open the circuit and stop calling upstream."""
+        # Arrange
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(502)
+
+        guard = make_guard(max_attempts=2, breaker_threshold=2)
+
+        async def fetch_twice():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                service = PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path)), guard=guard)
+                with pytest.raises(httpx.HTTPStatusError):
+                    await service.fetch_page(1)
+                await service.fetch_page(1)
+
+        # Act / Assert
+        with pytest.raises(CircuitOpenError):
+            run(fetch_twice())
+        assert len(calls) == 2
+
+    def test_fetch_page_revalidates_with_stored_etag(self, tmp_path):
+        """Test that a 304 reuses the on-disk body and sends the stored validators."""
+        # Arrange
+        body = {"total": 1, "records": [make_record(1)], "page": 1, "pageSize": 10}
+        seen_headers = []
+
+        def handler(request):
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
+
+        async def fetch_twice():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                # A fresh service per fetch, as after a process restart
+                first = await PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path))).fetch_page(1)
+                second = await PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path))).fetch_page(1)
+                return first, second
+
+        # Act
+        (first_meta, first_records), (second_meta, second_records) = run(fetch_twice())
+
+        # Assert
+        assert seen_headers == [None, '"v1"']
+        assert first_meta == second_meta == {"total": 1, "page": 1, "pageSize": 10}
+        assert list(first_records) == list(second_records)
+        assert [record.id for record in second_records] == ["1"]
+
+    def test_fetch_page_refetches_when_cached_body_missing(self, tmp_path):
+        """Test that a 304 without a stored body falls back to a full fetch."""
+        # Arrange
+        body = {"total": 0, "records": [], "page": 1, "pageSize": 10}
+        response_cache = DiskResponseCache(str(tmp_path))
+        calls = []
+
+        def handler(request):
+            calls.append(request.headers.get("If-Modified-Since"))
+            if request.headers.get("If-Modified-Since"):
+                return httpx.Response(304)
+            return httpx.Response(200, json=body, headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+        async def fetch_twice():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                service = PlanningPermissionsService(client, response_cache=response_cache)
+                await service.fetch_page(1)
+                for path in tmp_path.glob("*.body.gz"):
+                    path.unlink()
+                return await service.fetch_page(1)
+
+        # Act
+        meta, records = run(fetch_twice())
+
+        # Assert
+        assert calls == [None, "Mon, 01 Jan 2024 00:00:00 GMT", None]
+        assert meta == {"total": 0, "page": 1, "pageSize": 10}
+        assert len(records) == 0
+
+    def test_fetch_page_decodes_records_incrementally(self, tmp_path):
+        """Test that records split across arbitrary chunk boundaries are decoded."""
+        # Arrange
+        payload = (
+            b'{"total": 2, "records": ['
+            b'{"id": 1, "permissionType": "Development licence", "status": "Issued", "activity": "Landfill",'
+            b' "dutyHolder": "Acme", "suburb": "Geelong", "postcode": "3220", "extra": {"nested": [1, 2]}},'
+            b'{"id": "2", "permissionType": "Development licence", "status": "Revoked", "activity": "Compost",'
+            b' "dutyHolder": "Green Co", "suburb": "Ballarat", "postcode": 3350}'
+            b'], "page": 1, "pageSize": 10}'
+        )
+
+        class ChunkedStream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                for start in range(0, len(payload), 7):
+                    yield payload[start:start + 7]
+
+        def handler(request):
+            return httpx.Response(200, stream=ChunkedStream())
+
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path))).fetch_page(1)
+
+        # Act
+        meta, records = run(fetch())
+
+        # Assert
+        assert meta == {"total": 2, "page": 1, "pageSize": 10}
+        assert [(record.id, record.suburb, record.postcode) for record in records] == [
+            ("1", "Geelong", "3220"),
+            ("2", "Ballarat", "3350"),
+        ]
+
+    def test_fetch_page_truncated_body_raises(self, tmp_path):
+        """Test that a truncated body is an error and is not cached."""
+        # Arrange
+        def handler(request):
+            return httpx.Response(200, content=b'{"total": 1, "records": [{"id": 1', headers={"ETag": '"v1"'})
+
+        async def fetch():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await PlanningPermissionsService(client, response_cache=DiskResponseCache(str(tmp_path))).fetch_page(1)
+
+        # Act / Assert
+        with pytest.raises(ijson.IncompleteJSONError):
+            run(fetch())
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,86 @@
+import pytest
+from app.models.planning_permission import Record
+from app.models.record_store import CompactPlanningPermissions, RecordStore
+from tests.factories import make_record
+
+
+@pytest.fixture
+def records():
+    """Records with heavily repeated categorical values."""
+    return [make_record(str(i), status=["Issued", "Revoked"][i % 2], suburb=["Geelong", "Ballarat", "Melbourne"][i % 3]) for i in range(6)]
+
+
+class TestRecordStore:
+    """Test suite for RecordStore class."""
+
+    def test_round_trips_records(self, records):
+        """Test that stored rows materialise back into equal records."""
+        # Act
+        store = RecordStore(records)
+
+        # Assert
+        assert len(store) == 6
+        assert list(store) == records
+        assert store[2] == records[2]
+        assert store[-1] == records[-1]
+        assert store[1:3] == records[1:3]
+
+    def test_dictionary_encodes_repeated_values(self, records):
+        """Test that each distinct categorical value is stored once."""
+        # Act
+        store = RecordStore(records)
+
+        # Assert
+        assert store.columns["status"].values == ["Issued", "Revoked"]
+        assert store.columns["suburb"].values == ["Geelong", "Ballarat", "Melbourne"]
+        assert list(store.columns["suburb"].codes) == [0, 1, 2, 0, 1, 2]
+        assert store.columns["suburb"].code_of("Ballarat") == 1
+        assert store.columns["suburb"].code_of("Torquay") is None
+
+    def test_index_out_of_range(self, records):
+        """Test that out-of-range positions raise IndexError."""
+        store = RecordStore(records)
+        with pytest.raises(IndexError):
+            store[6]
+
+
+class TestCompactPlanningPermissions:
+    """Test suite for CompactPlanningPermissions class."""
+
+    def test_from_dict(self):
+        """Test parsing an upstream payload into a compact snapshot."""
+        # Arrange
+        payload = {
+            "total": 1,
+            "records": [{
+                "id": 7,
+                "permissionType": "Development licence",
+                "status": "Issued",
+                "activity": "Landfill",
+                "dutyHolder": "Acme Pty Ltd",
+                "suburb": "Geelong",
+                "postcode": "3220",
+            }],
+            "page": 1,
+            "pageSize": 1000,
+        }
+
+        # Act
+        result = CompactPlanningPermissions.from_dict(payload)
+
+        # Assert
+        assert (result.total, result.page, result.pageSize) == (1, 1, 1000)
+        assert result.permissions == [Record("7", "Development licence", "Issued", "Landfill", "Acme Pty Ltd", "Geelong", "3220")]
+
+    def test_to_planning_permissions_page(self, records):
+        """Test slicing a compact snapshot into a PlanningPermissions page."""
+        # Arrange
+        snapshot = CompactPlanningPermissions(6, RecordStore(records), 1, 6)
+
+        # Act
+        result = snapshot.to_planning_permissions(skip=2, limit=2)
+
+        # Assert
+        assert result.total == 6
+        assert result.permissions == records[2:4]
+        assert (result.page, result.pageSize) == (2, 2)
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.report import Report
+from app.models.user import User
+from app.schemas.report import ReportCreate
+from app.services.permission_record_service import PermissionRecordService
+from app.services.report_service import ReportService, run_report
+from tests.factories import make_record
+
+
+@pytest.fixture(autouse=True)
+def register(session_factory):
+    """A user and a stored register."""
+    db = session_factory()
+    db.add(User(id=1, email="test@example.com", username="testuser", hashed_password="x"))
+    PermissionRecordService(db).sync([
+        make_record("1"),
+        make_record("2", status="Revoked"),
+        make_record("3", suburb="Geelong"),
+        make_record("4", status="Revoked", suburb="Geelong"),
+        make_record("5", suburb="Geelong"),
+    ])
+    db.close()
+
+
+@pytest.fixture
+def queued(session_factory, monkeypatch):
+    """Create reports without handing them to the worker pool."""
+    submitted = []
+    monkeypatch.setattr(ReportService, "submit", lambda self, report_id: submitted.append(report_id))
+
+    def create(**kwargs):
+        db = session_factory()
+        report = ReportService(db).create_report(ReportCreate(title="Report", **kwargs), user_id=1)
+        db.close()
+        return report.id
+
+    create.submitted = submitted
+    return create
+
+
+class TestReportJobs:
+    """Test suite for the report job lifecycle."""
+
+    def test_create_queues_pending_report(self, session_factory, queued):
+        """Test that creating a report persists a pending job and submits it."""
+        # Act
+        report_id = queued(group_by=["suburb"], filters={"status": "Issued"})
+
+        # Assert
+        db = session_factory()
+        report = db.get(Report, report_id)
+        assert report.status == "pending"
+        assert report.parameters == {"group_by": ["suburb"], "filters": {"status": "Issued"}}
+        assert queued.submitted == [report_id]
+
+    def test_run_marks_report_done(self, session_factory, queued):
+        """Test that a worker computes the filtered result and marks the report done."""
+        # Arrange
+        report_id = queued(group_by=["suburb"], filters={"status": "Issued"})
+
+        # Act
+        run_report(report_id, session_factory)
+
+        # Assert
+        db = session_factory()
+        report = db.get(Report, report_id)
+        assert report.status == "done"
+        assert report.started_at is not None and report.finished_at is not None
+        assert report.result == {
+            "total": 3,
+            "groups": [{"suburb": "Geelong", "count": 2}, {"suburb": "Melbourne", "count": 1}],
+        }
+
+    def test_run_marks_report_failed(self, session_factory, queued):
+        """Test that an error during aggregation is recorded on the report."""
+        # Arrange
+        report_id = queued()
+        db = session_factory()
+        db.get(Report, report_id).parameters = {"group_by": ["missing"]}
+        db.commit()
+
+        # Act
+        run_report(report_id, session_factory)
+
+        # Assert
+        db = session_factory()
+        report = db.get(Report, report_id)
+        assert report.status == "failed"
+        assert "missing" in report.error
+
+    def test_job_runs_once(self, session_factory, queued):
+        """Test that a job already claimed by a worker is not recomputed."""
+        # Arrange
+        report_id = queued()
+        run_report(report_id, session_factory)
+        db = session_factory()
+        db.get(Report, report_id).result = {"total": -1}
+        db.commit()
+
+        # Act
+        run_report(report_id, session_factory)
+
+        # Assert
+        assert session_factory().get(Report, report_id).result == {"total": -1}
+
+    def test_resume_orphaned_running(self, session_factory, queued):
+        """Test that reports stuck running past the stale limit are re-queued, live ones are not."""
+        # Arrange
+        orphaned, live = queued(), queued()
+        db = session_factory()
+        db.get(Report, orphaned).status = "running"
+        db.get(Report, orphaned).started_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        db.get(Report, live).status = "running"
+        db.get(Report, live).started_at = datetime.now(timezone.utc)
+        db.commit()
+        queued.submitted.clear()
+
+        # Act
+        resumed = ReportService(db).resume_pending(stale_after=3600)
+
+        # Assert
+        assert resumed == 1
+        assert queued.submitted == [orphaned]
+        db.expire_all()
+        assert db.get(Report, orphaned).status == "pending"
+        assert db.get(Report, live).status == "running"
+
+    def test_resume_pending(self, session_factory, queued):
+        """Test that only reports still pending are re-queued."""
+        # Arrange
+        first, second = queued(), queued()
+        run_report(first, session_factory)
+        queued.submitted.clear()
+
+        # Act
+        resumed = ReportService(session_factory()).resume_pending()
+
+        # Assert
+        assert resumed == 1
+        assert queued.submitted == [second]
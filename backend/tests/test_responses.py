@@ -0,0 +1,240 @@
+import asyncio
+import gzip
+import pytest
+from starlette.requests import Request
+from app import responses
+from app.cache import AsyncTTLCache
+from app.models.planning_permission import PlanningPermissions, Record
+from app.responses import cached_json_response, file_response, parse_range
+
+
+def make_request(headers=None, method="GET"):
+    """A bare request carrying ``headers``."""
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "path": "/", "headers": raw})
+
+
+def send_response(response, extensions=None):
+    """Run an ASGI response and collect the messages it sends."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response({"type": "http", "extensions": extensions or {}}, None, send))
+    return messages
+
+
+@pytest.fixture(autouse=True)
+def body_cache(monkeypatch):
+    """Give each test an empty body cache."""
+    cache = AsyncTTLCache(ttl=60, max_stale=0)
+    monkeypatch.setattr(responses, "body_cache", cache)
+    return cache
+
+
+class TestCachedJsonResponse:
+    """Test suite for cached_json_response."""
+
+    def test_serialises_once_per_key(self):
+        """Test that repeat requests reuse the encoded bytes."""
+        # Arrange
+        builds = []
+
+        async def build():
+            builds.append(1)
+            return PlanningPermissions(1, [Record("1", "Development licence", "Issued", "Landfill", "Acme", "Geelong", "3220")], 1, 10)
+
+        async def serve_twice():
+            first = await cached_json_response(make_request(), ("page", 1), build)
+            second = await cached_json_response(make_request(), ("page", 1), build)
+            return first, second
+
+        # Act
+        first, second = asyncio.run(serve_twice())
+
+        # Assert
+        assert len(builds) == 1
+        assert first.body == second.body
+        assert first.body.startswith(b'{"total":1,"permissions":[{"id":"1"')
+        assert first.headers["content-type"] == "application/json"
+        assert first.headers["etag"] == second.headers["etag"]
+
+    def test_not_modified(self):
+        """Test that a matching If-None-Match gets an empty 304 with the ETag."""
+        # Arrange
+        async def build():
+            return {"total": 0}
+
+        async def revalidate():
+            first = await cached_json_response(make_request(), "key", build)
+            etag = first.headers["etag"]
+            return etag, await cached_json_response(make_request({"If-None-Match": etag}), "key", build)
+
+        # Act
+        etag, response = asyncio.run(revalidate())
+
+        # Assert
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+
+    def test_serves_compressed_variant(self):
+        """Test that a negotiated coding gets its compressed variant and its own ETag."""
+        # Arrange
+        async def build():
+            return {"groups": [{"status": "Issued", "count": i} for i in range(200)]}
+
+        async def serve():
+            plain = await cached_json_response(make_request(), "key", build)
+            packed = await cached_json_response(make_request({"Accept-Encoding": "gzip"}), "key", build)
+            revalidated = await cached_json_response(
+                make_request({"Accept-Encoding": "gzip", "If-None-Match": packed.headers["etag"]}), "key", build
+            )
+            return plain, packed, revalidated
+
+        # Act
+        plain, packed, revalidated = asyncio.run(serve())
+
+        # Assert
+        assert packed.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(packed.body) == plain.body
+        assert packed.headers["etag"] != plain.headers["etag"]
+        assert packed.headers["vary"] == "Accept-Encoding"
+        assert revalidated.status_code == 304
+
+    def test_compresses_only_negotiated_coding_once(self, monkeypatch):
+        """Test that a body is compressed lazily, once per coding clients ask for."""
+        # Arrange
+        compressed = []
+        compress = responses.compress
+        monkeypatch.setattr(responses, "compress", lambda data, encoding: compressed.append(encoding) or compress(data, encoding))
+
+        async def build():
+            return {"groups": [{"status": "Issued", "count": i} for i in range(200)]}
+
+        async def serve():
+            for _ in range(3):
+                await cached_json_response(make_request({"Accept-Encoding": "gzip"}), "key", build)
+            await cached_json_response(make_request(), "key", build)
+
+        # Act
+        asyncio.run(serve())
+
+        # Assert
+        assert compressed == ["gzip"]
+
+
+class TestParseRange:
+    """Test suite for parse_range."""
+
+    @pytest.mark.parametrize("header, expected", [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-10", (990, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=1000-", False),
+        ("bytes=-0", False),
+        ("bytes=5-2", None),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ])
+    def test_parse(self, header, expected):
+        """Test single ranges, suffixes, clamping and headers that are ignored."""
+        # Act
+        result = parse_range(header, 1000)
+
+        # Assert
+        assert result == expected
+
+
+class TestFileResponse:
+    """Test suite for file_response."""
+
+    @pytest.fixture
+    def path(self, tmp_path):
+        """A 1000 byte file."""
+        path = tmp_path / "export.csv"
+        path.write_bytes(bytes(range(250)) * 4)
+        return str(path)
+
+    def test_full_file_in_chunks(self, path, monkeypatch):
+        """Test that a plain GET streams the whole file with validators."""
+        # Arrange
+        monkeypatch.setattr(responses.RangeFileResponse, "chunk_size", 300)
+
+        # Act
+        response = file_response(make_request(), path, "export.csv", "text/csv")
+        messages = send_response(response)
+
+        # Assert
+        assert messages[0]["status"] == 200
+        assert b"".join(message.get("body", b"") for message in messages[1:]) == bytes(range(250)) * 4
+        assert len(messages) == 5
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == "1000"
+        assert response.headers["content-disposition"] == 'attachment; filename="export.csv"'
+        assert response.headers["etag"].startswith('"')
+
+    def test_range(self, path):
+        """Test that a Range request gets 206 with just those bytes."""
+        # Act
+        response = file_response(make_request({"Range": "bytes=10-19"}), path, "export.csv")
+        messages = send_response(response)
+
+        # Assert
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 10-19/1000"
+        assert messages[1]["body"] == bytes(range(10, 20))
+
+    def test_zerocopy_extension(self, path):
+        """Test that servers offering zero-copy send get the file handle and span."""
+        # Act
+        response = file_response(make_request({"Range": "bytes=500-"}), path, "export.csv")
+        messages = send_response(response, {"http.response.zerocopysend": {}})
+
+        # Assert
+        assert messages[1]["type"] == "http.response.zerocopysend"
+        assert (messages[1]["offset"], messages[1]["count"]) == (500, 500)
+
+    def test_stale_if_range_sends_whole_file(self, path):
+        """Test that a Range guarded by an outdated If-Range is ignored."""
+        # Act
+        response = file_response(make_request({"Range": "bytes=0-9", "If-Range": '"old"'}), path, "export.csv")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.count == 1000
+
+    def test_unsatisfiable_range(self, path):
+        """Test that a range past the end gets 416 with the file size."""
+        # Act
+        response = file_response(make_request({"Range": "bytes=1000-"}), path, "export.csv")
+
+        # Assert
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */1000"
+
+    def test_not_modified(self, path):
+        """Test that If-None-Match and If-Modified-Since revalidate to 304."""
+        # Arrange
+        first = file_response(make_request(), path, "export.csv")
+
+        # Act
+        by_etag = file_response(make_request({"If-None-Match": first.headers["etag"]}), path, "export.csv")
+        by_date = file_response(make_request({"If-Modified-Since": first.headers["last-modified"]}), path, "export.csv")
+
+        # Assert
+        assert by_etag.status_code == 304
+        assert by_date.status_code == 304
+
+    def test_head_sends_no_body(self, path):
+        """Test that HEAD gets the headers and an empty body."""
+        # Act
+        response = file_response(make_request(method="HEAD"), path, "export.csv")
+        messages = send_response(response)
+
+        # Assert
+        assert response.headers["content-length"] == "1000"
+        assert messages[1]["body"] == b""
@@ -0,0 +1,184 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import scheduler
+from app.models.planning_permission import Record, RegisterSync
+from app.scheduler import SyncScheduler
+from app.services.permission_record_service import PermissionRecordService
+
+
+@pytest.fixture
+def syncs(monkeypatch):
+    """Replace the register sync with a slow stub that counts calls."""
+    calls = []
+
+    class StubSyncService:
+        def __init__(self, db):
+            pass
+
+        async def sync(self, cached=False):
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return RegisterSync(id=len(calls))
+
+    monkeypatch.setattr(scheduler, "RegisterSyncService", StubSyncService)
+    return calls
+
+
+class TestSyncScheduler:
+    """Test suite for SyncScheduler class."""
+
+    def test_interval_is_jittered(self):
+        """Test that healthy runs are spaced by the interval within the jitter band."""
+        # Arrange
+        sync_scheduler = SyncScheduler(interval=100, jitter=0.1)
+
+        # Act
+        delays = [sync_scheduler.next_delay() for _ in range(200)]
+
+        # Assert
+        assert all(90 <= delay <= 110 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_backoff_grows_and_is_capped(self):
+        """Test that failures back off exponentially up to the cap."""
+        # Arrange
+        sync_scheduler = SyncScheduler(interval=100, backoff_base=10, backoff_max=35)
+
+        # Act
+        sync_scheduler.consecutive_failures = 2
+        second = [sync_scheduler.next_delay() for _ in range(200)]
+        sync_scheduler.consecutive_failures = 10
+        tenth = [sync_scheduler.next_delay() for _ in range(200)]
+
+        # Assert
+        assert all(0 <= delay <= 20 for delay in second)
+        assert all(0 <= delay <= 35 for delay in tenth)
+        assert max(tenth) > 20
+
+    def test_concurrent_first_reads_share_one_sync(self, session_factory, monkeypatch):
+        """Test that reads racing to fill an empty register run a single sync."""
+        # Arrange
+        calls = []
+
+        class PopulatingSyncService:
+            def __init__(self, db):
+                self.db = db
+
+            async def sync(self, cached=False):
+                calls.append(cached)
+                await asyncio.sleep(0.01)
+                return PermissionRecordService(self.db).sync([
+                    Record("1", "Development licence", "Issued", "Landfill", "Acme", "Geelong", "3220")
+                ])
+
+        monkeypatch.setattr(scheduler, "RegisterSyncService", PopulatingSyncService)
+        sync_scheduler = SyncScheduler(session_factory=session_factory)
+
+        async def first_reads():
+            await asyncio.gather(*(sync_scheduler.ensure_populated() for _ in range(10)))
+
+        # Act
+        asyncio.run(first_reads())
+
+        # Assert
+        assert calls == [True]
+        db = session_factory()
+        assert db.query(RegisterSync).count() == 1
+        db.close()
+
+    def test_overlapping_runs_are_skipped(self, session_factory, syncs):
+        """Test that a sync requested while another runs returns None immediately."""
+        # Arrange
+        sync_scheduler = SyncScheduler(session_factory=session_factory)
+
+        async def run_both():
+            return await asyncio.gather(sync_scheduler.run_once(), sync_scheduler.run_once())
+
+        # Act
+        first, second = asyncio.run(run_both())
+
+        # Assert
+        assert first.id == 1
+        assert second is None
+        assert len(syncs) == 1
+
+    def test_runs_are_exclusive_across_workers(self, session_factory, syncs):
+        """Test that a worker skips its run while another worker holds the sync lease."""
+        # Arrange
+        first_worker = SyncScheduler(session_factory=session_factory)
+        second_worker = SyncScheduler(session_factory=session_factory)
+
+        async def run_both():
+            return await asyncio.gather(first_worker.run_once(), second_worker.run_once())
+
+        # Act
+        results = asyncio.run(run_both())
+        after_release = asyncio.run(second_worker.run_once())
+
+        # Assert
+        assert sorted(result is None for result in results) == [False, True]
+        assert after_release.id == 2
+        assert len(syncs) == 2
+
+    def test_expired_lease_is_taken_over(self, session_factory, syncs):
+        """Test that a lease left by a dead worker is reclaimed once it expires."""
+        # Arrange
+        dead_worker = SyncScheduler(session_factory=session_factory, lease_seconds=-1)
+        live_worker = SyncScheduler(session_factory=session_factory)
+        dead_worker._claim_lease()
+
+        # Act
+        result = asyncio.run(live_worker.run_once())
+
+        # Assert
+        assert result.id == 1
+
+    def test_is_due(self, session_factory):
+        """Test that a run is due only when no sync finished within half an interval."""
+        # Arrange
+        sync_scheduler = SyncScheduler(interval=3600, session_factory=session_factory)
+        db = session_factory()
+
+        # Act
+        empty = asyncio.run(sync_scheduler.is_due())
+        db.add(RegisterSync(finished_at=datetime.now(timezone.utc) - timedelta(minutes=10)))
+        db.commit()
+        recent = asyncio.run(sync_scheduler.is_due())
+        db.add(RegisterSync(finished_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+        db.query(RegisterSync).filter(RegisterSync.id == 1).delete()
+        db.commit()
+        stale = asyncio.run(sync_scheduler.is_due())
+
+        # Assert
+        assert (empty, recent, stale) == (True, False, True)
+
+    def test_loop_syncs_on_start_and_stops(self, session_factory, syncs):
+        """Test that the background loop fills an empty register and shuts down cleanly."""
+        # Arrange
+        sync_scheduler = SyncScheduler(interval=3600, session_factory=session_factory)
+
+        async def start_and_stop():
+            sync_scheduler.start()
+            await asyncio.sleep(0.1)
+            await sync_scheduler.stop()
+
+        # Act
+        asyncio.run(start_and_stop())
+
+        # Assert
+        assert len(syncs) == 1
+        assert sync_scheduler.consecutive_failures == 0
+        assert sync_scheduler.next_run_at is None
+
+    def test_disabled(self):
+        """Test that a zero interval never starts the loop."""
+        # Arrange
+        sync_scheduler = SyncScheduler(interval=0)
+
+        # Act
+        sync_scheduler.start()
+
+        # Assert
+        assert sync_scheduler._task is None
+        assert sync_scheduler.status()["enabled"] is False
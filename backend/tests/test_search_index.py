@@ -0,0 +1,100 @@
+import pytest
+from app.services import search_index
+from app.services.search_index import RecordSearchIndex, get_search_index
+from tests.factories import make_record
+
+
+@pytest.fixture
+def index():
+    """Search index over a small register."""
+    return RecordSearchIndex([
+        make_record("1", activity="Landfill", duty_holder="Cleanaway Operations", suburb="Geelong"),
+        make_record("2", activity="Waste treatment", duty_holder="Acme Pty Ltd", suburb="Geelong"),
+        make_record("3", activity="Acme composting", duty_holder="Green Co", suburb="Ballarat"),
+        make_record("4", activity="Wastewater discharge", duty_holder="Barwon Water", suburb="Torquay"),
+    ])
+
+
+class TestRecordSearchIndex:
+    """Test suite for RecordSearchIndex class."""
+
+    def test_exact_match(self, index):
+        """Test that an exact token finds its record."""
+        # Act
+        total, hits = index.search("cleanaway")
+
+        # Assert
+        assert total == 1
+        assert hits[0][0].id == "1"
+
+    def test_duty_holder_outranks_activity(self, index):
+        """Test that a duty holder hit ranks above the same word in the activity."""
+        # Act
+        total, hits = index.search("acme")
+
+        # Assert
+        assert total == 2
+        assert [record.id for record, _ in hits] == ["2", "3"]
+
+    def test_every_term_must_match(self, index):
+        """Test that multi-word queries intersect their terms."""
+        # Act
+        total, hits = index.search("acme geelong")
+
+        # Assert
+        assert total == 1
+        assert hits[0][0].id == "2"
+
+    def test_typo_tolerance(self, index):
+        """Test that a misspelt term still matches by trigram similarity."""
+        # Act
+        total, hits = index.search("gelong")
+
+        # Assert
+        assert {record.id for record, _ in hits} == {"1", "2"}
+
+    def test_prefix_match(self, index):
+        """Test that a partial word matches by prefix."""
+        # Act
+        total, hits = index.search("waste")
+
+        # Assert
+        assert {record.id for record, _ in hits} == {"2", "4"}
+        assert hits[0][0].id == "2"
+
+    def test_no_match(self, index):
+        """Test that unrelated queries return nothing."""
+        assert index.search("quarry") == (0, [])
+
+    def test_limit(self, index):
+        """Test that the limit caps hits but not the match count."""
+        # Act
+        total, hits = index.search("geelong", limit=1)
+
+        # Assert
+        assert total == 2
+        assert len(hits) == 1
+
+
+class TestGetSearchIndex:
+    """Test suite for the per-worker search index holder."""
+
+    def test_rebuilds_only_when_version_changes(self, monkeypatch):
+        """Test that the index is reused until the register version moves on."""
+        # Arrange
+        monkeypatch.setattr(search_index, "_index", None)
+        loads = []
+
+        def load_records():
+            loads.append(1)
+            return [make_record("1")]
+
+        # Act
+        first = get_search_index(1, load_records)
+        again = get_search_index(1, load_records)
+        newer = get_search_index(2, load_records)
+
+        # Assert
+        assert first is again
+        assert newer is not first
+        assert len(loads) == 2
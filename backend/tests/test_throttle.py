@@ -0,0 +1,164 @@
+import asyncio
+import pytest
+from app import throttle
+from app.throttle import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, TokenBucket
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(throttle.time, "monotonic", fake)
+    return fake
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket class."""
+
+    def test_burst_then_rate(self, clock):
+        """Test that a full bucket serves a burst and then spaces calls by the rate."""
+        # Arrange
+        bucket = TokenBucket(rate=10, burst=2)
+
+        # Act
+        waits = [bucket.reserve() for _ in range(4)]
+
+        # Assert
+        assert waits == pytest.approx([0.0, 0.0, 0.1, 0.2])
+
+    def test_refills_over_time(self, clock):
+        """Test that tokens accrue while idle, up to the burst size."""
+        # Arrange
+        bucket = TokenBucket(rate=10, burst=2)
+        bucket.reserve()
+        bucket.reserve()
+
+        # Act
+        clock.now += 10
+        waits = [bucket.reserve() for _ in range(3)]
+
+        # Assert
+        assert waits == pytest.approx([0.0, 0.0, 0.1])
+
+    def test_zero_rate_is_unlimited(self):
+        """Test that a zero rate never waits."""
+        bucket = TokenBucket(rate=0)
+        assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+class TestAdaptiveLimiter:
+    """Test suite for AdaptiveLimiter class."""
+
+    def test_additive_increase(self, clock):
+        """Test that fast successes raise the limit by about one per round."""
+        # Arrange
+        limiter = AdaptiveLimiter(2, maximum=10)
+
+        # Act
+        for _ in range(4):
+            limiter.on_success(0.1)
+
+        # Assert
+        assert 3 < limiter.limit < 4
+
+    def test_multiplicative_decrease_once_per_window(self, clock):
+        """Test that overloads halve the limit, at most once per baseline latency."""
+        # Arrange
+        limiter = AdaptiveLimiter(8)
+        limiter.on_success(0.5)
+        before = limiter.limit
+
+        # Act
+        limiter.on_overload()
+        limiter.on_overload()
+        clock.now += 1
+        limiter.on_success(5.0)
+
+        # Assert
+        assert limiter.limit == pytest.approx(before / 4)
+
+    def test_caps_concurrency(self):
+        """Test that no more than the current limit run at once."""
+        # Arrange
+        limiter = AdaptiveLimiter(2)
+        peak = []
+
+        async def task():
+            await limiter.acquire()
+            peak.append(limiter.in_flight)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        async def run_all():
+            await asyncio.gather(*(task() for _ in range(6)))
+
+        # Act
+        asyncio.run(run_all())
+
+        # Assert
+        assert max(peak) == 2
+        assert limiter.in_flight == 0
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker class."""
+
+    def test_opens_after_threshold(self, clock):
+        """Test that consecutive failures open the circuit."""
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+        # Act
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_after == 30
+
+    def test_half_open_allows_one_probe(self, clock):
+        """Test that after the timeout one probe passes and its success closes the circuit."""
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.now += 31
+
+        # Act
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+
+        # Assert
+        assert breaker.state == "closed"
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self, clock):
+        """Test that a failed probe re-opens the circuit."""
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now += 31
+        breaker.before_call()
+
+        # Act
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_after == 30
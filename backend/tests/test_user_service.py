@@ -1,7 +1,10 @@
+import asyncio
 import pytest
 from unittest.mock import Mock, MagicMock, patch
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
-from app.services.user_service import UserService
+from app.database import Base
+from app.services.user_service import AsyncUserService, UserService
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
@@ -185,11 +188,11 @@ class TestUserService:
         mock_db.query.assert_called_once_with(User)
         assert result is None
 
-    @patch('app.services.user_service.verify_password')
+    @patch('app.services.user_service.verify_and_update_password')
     def test_authenticate_user_success(self, mock_verify, user_service, sample_user_model):
         """Test successful user authentication."""
         # Arrange
-        mock_verify.return_value = True
+        mock_verify.return_value = (True, None)
         user_service.get_user_by_username = Mock(return_value=sample_user_model)
         
         # Act
@@ -199,8 +202,23 @@ class TestUserService:
         user_service.get_user_by_username.assert_called_once_with("testuser")
         mock_verify.assert_called_once_with("testpassword123", "hashed_password_123")
         assert result == sample_user_model
+        user_service.db.commit.assert_not_called()
 
-    @patch('app.services.user_service.verify_password')
+    @patch('app.services.user_service.verify_and_update_password')
+    def test_authenticate_user_rehashes_outdated_hash(self, mock_verify, user_service, mock_db, sample_user_model):
+        """Test that a successful login stores the upgraded hash."""
+        # Arrange
+        mock_verify.return_value = (True, "rehashed_password")
+        user_service.get_user_by_username = Mock(return_value=sample_user_model)
+
+        # Act
+        result = user_service.authenticate_user("testuser", "testpassword123")
+
+        # Assert
+        assert result.hashed_password == "rehashed_password"
+        mock_db.commit.assert_called_once()
+
+    @patch('app.services.user_service.verify_and_update_password')
     def test_authenticate_user_user_not_found(self, mock_verify, user_service):
         """Test authentication when user doesn't exist."""
         # Arrange
@@ -214,11 +232,11 @@ class TestUserService:
         mock_verify.assert_not_called()
         assert result is None
 
-    @patch('app.services.user_service.verify_password')
+    @patch('app.services.user_service.verify_and_update_password')
     def test_authenticate_user_wrong_password(self, mock_verify, user_service, sample_user_model):
         """Test authentication with wrong password."""
         # Arrange
-        mock_verify.return_value = False
+        mock_verify.return_value = (False, None)
         user_service.get_user_by_username = Mock(return_value=sample_user_model)
         
         # Act
@@ -298,6 +316,20 @@ class TestUserService:
         mock_db.commit.assert_called_once()
         assert result is True
 
+    @patch('app.services.user_service.invalidate_user_principals')
+    def test_update_and_delete_invalidate_principals(self, mock_invalidate, user_service, sample_user_model, sample_user_update):
+        """Test that changing or deleting a user drops their cached principals."""
+        # Arrange
+        user_service.get_user_by_id = Mock(return_value=sample_user_model)
+
+        # Act
+        user_service.update_user(1, sample_user_update)
+        user_service.delete_user(1)
+
+        # Assert
+        assert mock_invalidate.call_count == 2
+        mock_invalidate.assert_called_with(1)
+
     def test_delete_user_not_found(self, user_service, mock_db):
         """Test deleting non-existent user."""
         # Arrange
@@ -356,3 +388,124 @@ class TestUserService:
         mock_query.offset.assert_called_once_with(0)
         mock_offset.limit.assert_called_once_with(100)
         assert result == mock_users
+
+    def test_get_users_after_first_page(self, user_service, mock_db):
+        """Test keyset pagination without a cursor starts from the lowest id."""
+        # Arrange
+        mock_users = [Mock(spec=User)]
+        mock_query = Mock()
+        mock_order_by = Mock()
+        mock_limit = Mock()
+
+        mock_db.query.return_value = mock_query
+        mock_query.order_by.return_value = mock_order_by
+        mock_order_by.limit.return_value = mock_limit
+        mock_limit.all.return_value = mock_users
+
+        # Act
+        result = user_service.get_users_after(limit=20)
+
+        # Assert
+        mock_db.query.assert_called_once_with(User)
+        mock_query.filter.assert_not_called()
+        mock_order_by.limit.assert_called_once_with(20)
+        assert result == mock_users
+
+    def test_get_users_after_cursor(self, user_service, mock_db):
+        """Test keyset pagination filters on ids after the cursor."""
+        # Arrange
+        mock_users = [Mock(spec=User)]
+        mock_query = Mock()
+        mock_filter = Mock()
+        mock_order_by = Mock()
+        mock_limit = Mock()
+
+        mock_db.query.return_value = mock_query
+        mock_query.filter.return_value = mock_filter
+        mock_filter.order_by.return_value = mock_order_by
+        mock_order_by.limit.return_value = mock_limit
+        mock_limit.all.return_value = mock_users
+
+        # Act
+        result = user_service.get_users_after(after_id=42, limit=20)
+
+        # Assert
+        mock_query.filter.assert_called_once()
+        mock_query.offset.assert_not_called()
+        mock_order_by.limit.assert_called_once_with(20)
+        assert result == mock_users
+
+
+def run_with_async_session(tmp_path, steps):
+    """Run ``steps(db)`` against a fresh SQLite database through an AsyncSession."""
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await steps(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+class TestAsyncUserService:
+    """Test suite for AsyncUserService class."""
+
+    @pytest.fixture(autouse=True)
+    def fast_hashing(self, monkeypatch):
+        """Replace bcrypt with a reversible stand-in."""
+        async def fake_hash(password):
+            return f"hashed:{password}"
+
+        async def fake_verify(password, hashed_password):
+            return hashed_password == f"hashed:{password}", None
+
+        monkeypatch.setattr("app.services.user_service.get_password_hash_async", fake_hash)
+        monkeypatch.setattr("app.services.user_service.verify_and_update_password_async", fake_verify)
+
+    def test_create_and_authenticate(self, tmp_path, sample_user_create):
+        """Test that a created user can be looked up and authenticated."""
+        # Arrange
+        async def steps(db):
+            service = AsyncUserService(db)
+            created = await service.create_user(sample_user_create)
+            return (
+                created,
+                await service.get_user_by_email("test@example.com"),
+                await service.authenticate_user("testuser", "testpassword123"),
+                await service.authenticate_user("testuser", "wrong"),
+            )
+
+        # Act
+        created, by_email, authenticated, rejected = run_with_async_session(tmp_path, steps)
+
+        # Assert
+        assert created.id is not None
+        assert created.created_at is not None
+        assert by_email.id == created.id
+        assert authenticated.id == created.id
+        assert rejected is None
+
+    @patch('app.services.user_service.invalidate_user_principals')
+    def test_update_delete_and_page(self, mock_invalidate, tmp_path, sample_user_create, sample_user_update):
+        """Test updating, keyset paging and deleting users."""
+        # Arrange
+        async def steps(db):
+            service = AsyncUserService(db)
+            created = await service.create_user(sample_user_create)
+            updated = await service.update_user(created.id, sample_user_update)
+            page = await service.get_users_after(after_id=None, limit=10)
+            deleted = await service.delete_user(created.id)
+            return updated, page, deleted, await service.get_users()
+
+        # Act
+        updated, page, deleted, remaining = run_with_async_session(tmp_path, steps)
+
+        # Assert
+        assert updated.email == "updated@example.com"
+        assert [user.id for user in page] == [updated.id]
+        assert deleted is True
+        assert remaining == []
+        assert mock_invalidate.call_count == 2
@@ -1,6 +1,11 @@
 import { useQuery } from '@tanstack/react-query'
-import { Users, BarChart3, Download, Activity } from 'lucide-react'
-import { api } from '../services/api'
+import { Users, BarChart3, Download, Activity, FileText } from 'lucide-react'
+import { api, reportApi } from '../services/api'
+
+interface StatGroup {
+  count: number
+  [field: string]: string | number
+}
 
 const Dashboard = () => {
   const { data: healthCheck } = useQuery({
@@ -8,7 +13,22 @@ const Dashboard = () => {
     queryFn: () => api.get('/health'),
   })
 
+  const { data: statusStats } = useQuery({
+    queryKey: ['reportStats', 'status'],
+    queryFn: () => reportApi.getReportStats(['status']),
+  })
+
+  const permissionTotal: number | undefined = statusStats?.data?.total
+  const statusGroups: StatGroup[] = statusStats?.data?.groups ?? []
+
   const stats = [
+    {
+      name: 'Planning Permissions',
+      value: permissionTotal === undefined ? '—' : permissionTotal.toLocaleString(),
+      icon: FileText,
+      change: '',
+      changeType: 'neutral' as const,
+    },
     {
       name: 'Total Users',
       value: '1,234',
@@ -49,7 +69,7 @@ const Dashboard = () => {
       </div>
 
       {/* Stats Grid */}
-      <div className="grid grid-cols-1 gap-6 sm:grid-cols-2 lg:grid-cols-4">
+      <div className="grid grid-cols-1 gap-6 sm:grid-cols-2 lg:grid-cols-5">
         {stats.map((stat) => {
           const Icon = stat.icon
           return (
@@ -92,6 +112,27 @@ const Dashboard = () => {
         })}
       </div>
 
+      {/* Permissions by Status */}
+      <div className="mt-8">
+        <div className="overflow-hidden rounded-lg bg-white shadow">
+          <div className="px-4 py-5 sm:p-6">
+            <h3 className="text-lg font-medium leading-6 text-gray-900">
+              Permissions by Status
+            </h3>
+            <ul className="mt-5 divide-y divide-gray-200">
+              {statusGroups.map((group) => (
+                <li key={String(group.status)} className="flex justify-between py-2 text-sm">
+                  <span className="text-gray-500">{group.status}</span>
+                  <span className="font-semibold text-gray-900">
+                    {group.count.toLocaleString()}
+                  </span>
+                </li>
+              ))}
+            </ul>
+          </div>
+        </div>
+      </div>
+
       {/* Recent Activity */}
       <div className="mt-8">
         <div className="overflow-hidden rounded-lg bg-white shadow">
@@ -50,12 +50,21 @@ export const userApi = {
 }
 
 export const reportApi = {
-  getReports: () => api.get('/v1/reports/'),
+  getReports: (params: Record<string, string | number> = {}) =>
+    api.get('/v1/reports/', { params }),
+  searchReports: (q: string, limit = 20) =>
+    api.get('/v1/reports/search', { params: { q, limit } }),
+  getReportChanges: (since = 0) => api.get(`/v1/reports/changes?since=${since}`),
+  getReportStats: (groupBy: string[] = ['status']) =>
+    api.get('/v1/reports/stats', {
+      params: { group_by: groupBy },
+      paramsSerializer: { indexes: null },
+    }),
   getReport: (id: number) => api.get(`/v1/reports/${id}`),
   createReport: (reportData: any) => api.post('/v1/reports/', reportData),
 }
 
 export const downloadApi = {
   getDownloads: () => api.get('/v1/downloads/'),
-  downloadFile: (id: number) => api.get(`/v1/downloads/${id}`, { responseType: 'blob' }),
+  downloadFile: (id: number) => api.get(`/v1/downloads/${id}/download`, { responseType: 'blob' }),
 }